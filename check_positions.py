@@ -1,9 +1,7 @@
 """現在のHyperliquidポジションを確認"""
 import sys
-import os
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from funding_arb._info_cache import cached_user_state
 from funding_arb.hyperliquid_client import HyperliquidExecutionClient
 
 print("Hyperliquid ポジション確認中...")
@@ -13,7 +11,7 @@ hl_exec = HyperliquidExecutionClient(testnet=False)
 
 try:
     # ユーザー状態を取得
-    user_state = hl_exec.info.user_state(hl_exec.main_address)
+    user_state = cached_user_state(hl_exec.info, hl_exec.main_address, ttl=5)
 
     if not user_state or 'assetPositions' not in user_state:
         print("ポジション情報を取得できませんでした")
@@ -1,11 +1,13 @@
 """最近の取引履歴を確認"""
-import sys
-import os
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from funding_arb._info_cache import cached_user_fills
 from funding_arb.hyperliquid_client import HyperliquidExecutionClient
 from datetime import datetime, timedelta
+from itertools import islice
+from operator import itemgetter
+
+# Hyperliquid の fill は常にこれらのキーを持つ
+get_fill_fields = itemgetter('time', 'coin', 'side', 'px', 'sz', 'closedPnl')
 
 print("Hyperliquid 取引履歴確認中...")
 print("=" * 70)
@@ -14,44 +16,33 @@ hl_exec = HyperliquidExecutionClient(testnet=False)
 
 try:
     # ユーザーの取引履歴を取得
-    user_fills = hl_exec.info.user_fills(hl_exec.main_address)
+    user_fills = cached_user_fills(hl_exec.info, hl_exec.main_address, ttl=5)
 
     if not user_fills:
         print("取引履歴がありません")
     else:
         print(f"取得した取引数: {len(user_fills)}\n")
 
-        # 最近1時間の取引のみ表示
-        one_hour_ago = datetime.now() - timedelta(hours=1)
-
-        recent_fills = []
-        for fill in user_fills[:20]:  # 最新20件
-            timestamp_ms = fill.get('time', 0)
-            fill_time = datetime.fromtimestamp(timestamp_ms / 1000)
-
-            if fill_time > one_hour_ago:
-                recent_fills.append((fill_time, fill))
+        # 最近1時間の取引のみ表示（ミリ秒の整数で比較）
+        cutoff_ms = int((datetime.now() - timedelta(hours=1)).timestamp() * 1000)
+        recent_fills = [f for f in islice(user_fills, 20) if f['time'] > cutoff_ms]  # 最新20件
 
         if not recent_fills:
             print("過去1時間の取引はありません")
             print("\n最新5件の取引:")
-            for fill in user_fills[:5]:
-                timestamp_ms = fill.get('time', 0)
+            for fill in islice(user_fills, 5):
+                timestamp_ms, coin, side, px, sz, _ = get_fill_fields(fill)
                 fill_time = datetime.fromtimestamp(timestamp_ms / 1000)
-                coin = fill.get('coin', 'N/A')
-                side = fill.get('side', 'N/A')
-                px = float(fill.get('px', 0))
-                sz = float(fill.get('sz', 0))
-                print(f"  {fill_time.strftime('%Y-%m-%d %H:%M:%S')} - {coin} {side} {sz:.4f} @ ${px:.6f}")
+                print(f"  {fill_time.strftime('%Y-%m-%d %H:%M:%S')} - {coin} {side} {float(sz):.4f} @ ${float(px):.6f}")
         else:
             print(f"過去1時間の取引: {len(recent_fills)}件\n")
 
-            for fill_time, fill in sorted(recent_fills, key=lambda x: x[0], reverse=True):
-                coin = fill.get('coin', 'N/A')
-                side = fill.get('side', 'N/A')
-                px = float(fill.get('px', 0))
-                sz = float(fill.get('sz', 0))
-                closed_pnl = float(fill.get('closedPnl', 0))
+            for fill in sorted(recent_fills, key=itemgetter('time'), reverse=True):
+                timestamp_ms, coin, side, px, sz, closed_pnl = get_fill_fields(fill)
+                fill_time = datetime.fromtimestamp(timestamp_ms / 1000)
+                px = float(px)
+                sz = float(sz)
+                closed_pnl = float(closed_pnl)
 
                 print(f"{fill_time.strftime('%Y-%m-%d %H:%M:%S')}")
                 print(f"  銘柄: {coin}")
@@ -1,10 +1,13 @@
 """全ポジションをクローズ"""
 import sys
-import os
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from funding_arb.hyperliquid_client import HyperliquidExecutionClient
+from funding_arb._info_cache import invalidate_user_state
+from funding_arb.hyperliquid_client import HyperliquidExecutionClient, slippage_limit_price
+
+# Hyperliquidの1アクションあたりの注文数上限
+MAX_ORDERS_PER_BATCH = 50
+# market_closeと同じ許容スリッページ（5%）
+SLIPPAGE = 0.05
 
 print("全ポジションをクローズします...")
 print("=" * 70)
@@ -12,44 +15,82 @@ print("=" * 70)
 hl_exec = HyperliquidExecutionClient(testnet=False)
 
 try:
-    # 現在のポジション取得
+    # 現在のポジション取得（クローズ数量に使うのでキャッシュは通さない）
     user_state = hl_exec.info.user_state(hl_exec.main_address)
 
     if not user_state or 'assetPositions' not in user_state:
         print("ポジション情報を取得できませんでした")
         sys.exit(1)
 
-    positions = user_state['assetPositions']
+    # サイズ0のポジションは事前に除外（szi は文字列なので float 変換は1回だけ）
+    positions = [
+        (pos['position']['coin'], szi)
+        for pos in user_state['assetPositions']
+        if (szi := float(pos['position']['szi'])) != 0.0
+    ]
 
-    if not positions or len(positions) == 0:
+    if not positions:
         print("クローズするポジションはありません")
         sys.exit(0)
 
     print(f"クローズ対象: {len(positions)}ポジション\n")
 
-    # 各ポジションをクローズ
-    for i, pos in enumerate(positions, 1):
-        position = pos['position']
-        coin = position['coin']
-        szi = float(position['szi'])
-
-        if szi == 0:
-            print(f"[{i}/{len(positions)}] {coin}: サイズ0、スキップ")
-            continue
-
+    # 指値の基準価格は allMids を1回だけ取得して全銘柄で使う
+    mids = hl_exec.info.all_mids()
+    sz_decimals = {
+        asset["name"]: asset.get("szDecimals", 0)
+        for asset in hl_exec.info.meta().get("universe", [])
+    }
+
+    # クローズ注文を組み立て（reduce-onlyのIoC成行注文）
+    close_targets = []
+    order_requests = []
+    for i, (coin, szi) in enumerate(positions, 1):
+        is_buy = szi < 0
         side = "LONG" if szi > 0 else "SHORT"
-        print(f"[{i}/{len(positions)}] {coin} {side}をクローズ中...", end=" ")
+        mid = mids.get(coin)
+        if mid is None:
+            # 価格が無い銘柄は飛ばし、残りのクローズは続ける
+            print(f"[{i}/{len(positions)}] {coin} {side}: ❌ 失敗: allMids に価格がありません")
+            continue
+        close_targets.append((i, coin, side))
+        order_requests.append({
+            "coin": coin,
+            "is_buy": is_buy,
+            "sz": abs(szi),
+            "limit_px": slippage_limit_price(
+                float(mid), is_buy, SLIPPAGE, sz_decimals.get(coin, 0)
+            ),
+            "order_type": {"limit": {"tif": "Ioc"}},
+            "reduce_only": True,
+        })
+
+    # 1署名あたり最大50注文でまとめて送信
+    for start in range(0, len(order_requests), MAX_ORDERS_PER_BATCH):
+        batch = order_requests[start:start + MAX_ORDERS_PER_BATCH]
+        targets = close_targets[start:start + MAX_ORDERS_PER_BATCH]
 
         try:
-            result = hl_exec.exchange.market_close(coin=coin)
+            result = hl_exec.exchange.bulk_orders(batch)
+        except Exception as e:
+            for i, coin, side in targets:
+                print(f"[{i}/{len(positions)}] {coin} {side}: ❌ エラー: {e}")
+            continue
 
-            if result.get("status") == "ok":
-                print("✅ 成功")
+        if result.get("status") != "ok":
+            for i, coin, side in targets:
+                print(f"[{i}/{len(positions)}] {coin} {side}: ❌ 失敗: {result}")
+            continue
+
+        statuses = result["response"]["data"]["statuses"]
+        for (i, coin, side), status in zip(targets, statuses):
+            if "error" in status:
+                print(f"[{i}/{len(positions)}] {coin} {side}: ❌ 失敗: {status['error']}")
             else:
-                print(f"❌ 失敗: {result}")
+                print(f"[{i}/{len(positions)}] {coin} {side}: ✅ 成功")
 
-        except Exception as e:
-            print(f"❌ エラー: {e}")
+    # クローズ後はポジションが変わるのでキャッシュを破棄
+    invalidate_user_state(hl_exec.main_address)
 
     print("\n" + "=" * 70)
     print("全ポジションのクローズ処理が完了しました")
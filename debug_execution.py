@@ -1,10 +1,9 @@
 """詳細ログ付き実行テスト"""
-import sys
-import os
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import atexit
 import logging
+import logging.handlers
+import queue
 from datetime import datetime
 from funding_arb import (
     FundingArbConfig,
@@ -20,10 +19,18 @@ from funding_arb.types import PortfolioState
 from funding_arb.hyperliquid_client import HyperliquidMarketDataAdapter, HyperliquidExecutionClient
 
 # ログレベルをDEBUGに設定
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# DEBUG出力は量が多いので、QueueHandler経由で別スレッドからstderrに書き出す
+_log_queue: queue.Queue = queue.Queue(-1)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 )
+_root_logger = logging.getLogger()
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_root_logger.setLevel(logging.DEBUG)
+_log_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 print("=" * 70)
 print("デバッグ実行テスト")
@@ -1,38 +1,46 @@
 """Hyperliquid Funding Rate デバッグスクリプト"""
 
-import sys
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
+import heapq
 
 from funding_arb import LorisAPIClient
-
-# Loris APIからデータ取得
-client = LorisAPIClient()
-response = client.fetch()
-
-# Hyperliquidのみ抽出
-hl_rates = [fr for fr in response.funding_rates if fr.exchange == "hyperliquid"]
-
-print(f"総Funding Rate数: {len(response.funding_rates)}")
-print(f"Hyperliquid FR数: {len(hl_rates)}")
-print()
-
-# 正と負のFRを分類
-positive = [fr for fr in hl_rates if fr.rate > 0]
-negative = [fr for fr in hl_rates if fr.rate < 0]
-
-print(f"正のFR（long払い）: {len(positive)}個")
-print(f"負のFR（short払い）: {len(negative)}個")
-print()
-
-# サンプル表示
-print("=== 正のFR（上位5件）===")
-for fr in sorted(positive, key=lambda x: x.rate, reverse=True)[:5]:
-    print(f"  {fr.symbol}: {fr.rate*100:.4f}%")
-
-print()
-print("=== 負のFR（下位5件）===")
-for fr in sorted(negative, key=lambda x: x.rate)[:5]:
-    print(f"  {fr.symbol}: {fr.rate*100:.4f}%")
-
-print()
-print(f"理論的ペア数: {len(positive)} × {len(negative)} = {len(positive) * len(negative)}")
+from funding_arb.http_session import close_session, get_session
+from funding_arb.cache import DiskCache
+
+try:
+    # Loris APIからデータ取得
+    client = LorisAPIClient(session=get_session(), disk_cache=DiskCache())
+    response = client.fetch()
+
+    # Hyperliquidのみ抽出し、正と負のFRを1回の走査で分類
+    hl_rates, positive, negative = {}, [], []
+    for fr in response.funding_rates:
+        if fr.exchange != "hyperliquid":
+            continue
+        hl_rates[fr.symbol] = fr.rate
+        if fr.rate > 0:
+            positive.append(fr)
+        elif fr.rate < 0:
+            negative.append(fr)
+
+    print(f"総Funding Rate数: {len(response.funding_rates)}")
+    print(f"Hyperliquid FR数: {len(hl_rates)}")
+    print()
+
+    print(f"正のFR（long払い）: {len(positive)}個")
+    print(f"負のFR（short払い）: {len(negative)}個")
+    print()
+
+    # サンプル表示
+    print("=== 正のFR（上位5件）===")
+    for fr in heapq.nlargest(5, positive, key=lambda x: x.rate):
+        print(f"  {fr.symbol}: {fr.rate*100:.4f}%")
+
+    print()
+    print("=== 負のFR（下位5件）===")
+    for fr in heapq.nsmallest(5, negative, key=lambda x: x.rate):
+        print(f"  {fr.symbol}: {fr.rate*100:.4f}%")
+
+    print()
+    print(f"理論的ペア数: {len(positive)} × {len(negative)} = {len(positive) * len(negative)}")
+finally:
+    close_session()
@@ -1,10 +1,8 @@
 """注文レスポンスを詳しく確認"""
-import sys
-import os
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-import json
+import time
+
+from funding_arb._json import dumps_pretty
 from funding_arb.hyperliquid_client import HyperliquidExecutionClient
 
 hl_exec = HyperliquidExecutionClient(testnet=False)
@@ -20,6 +18,7 @@ size = 1.0  # 最小サイズ
 print(f"注文: {ticker} {'BUY' if is_buy else 'SELL'} {size}")
 
 try:
+    submitted_ms = int(time.time() * 1000)
     result = hl_exec.exchange.market_open(
         name=ticker,
         is_buy=is_buy,
@@ -27,20 +26,29 @@ try:
     )
 
     print("\nレスポンス:")
-    print(json.dumps(result, indent=2))
+    print(dumps_pretty(result))
 
     if result.get("status") == "ok":
         print("\n✅ 注文成功")
 
-        # 約定したか確認
-        user_fills = hl_exec.info.user_fills(hl_exec.main_address)
-        if user_fills:
-            latest = user_fills[0]
-            print(f"\n最新の約定:")
-            print(f"  銘柄: {latest.get('coin')}")
-            print(f"  サイド: {latest.get('side')}")
-            print(f"  サイズ: {latest.get('sz')}")
-            print(f"  価格: {latest.get('px')}")
+        # 約定情報は注文レスポンスの statuses から直接読む
+        status = result["response"]["data"]["statuses"][0]
+        if "filled" in status:
+            filled = status["filled"]
+            print(f"\n約定:")
+            print(f"  oid: {filled.get('oid')}")
+            print(f"  サイズ: {filled.get('totalSz')}")
+            print(f"  平均価格: {filled.get('avgPx')}")
+        elif "resting" in status:
+            # 板に残った場合のみ、oid で約定履歴を確認
+            oid = status["resting"].get("oid")
+            print(f"\n未約定（resting） oid: {oid}")
+            fills = hl_exec.info.user_fills_by_time(hl_exec.main_address, submitted_ms)
+            for fill in fills:
+                if fill.get("oid") == oid:
+                    print(f"  約定: {fill.get('coin')} {fill.get('side')} {fill.get('sz')} @ {fill.get('px')}")
+        else:
+            print(f"\nステータス: {status}")
     else:
         print(f"\n❌ 注文失敗: {result}")
 
@@ -1,8 +1,4 @@
 """リスクチェックのデバッグ"""
-import sys
-import os
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import logging
 logging.basicConfig(level=logging.INFO)
@@ -1,7 +1,6 @@
 """DynamicUniverseProvider 詳細デバッグ"""
 
-import sys
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
+import heapq
 
 from funding_arb import (
     FundingArbConfig,
@@ -9,6 +8,7 @@ from funding_arb import (
 )
 from funding_arb.config import ExchangeConfig
 from funding_arb.universe import DynamicUniverseProvider
+from funding_arb.cache import DiskCache
 
 # 設定
 config = FundingArbConfig(
@@ -19,7 +19,7 @@ config = FundingArbConfig(
     allow_single_exchange_pairs=True,
 )
 
-loris_client = LorisAPIClient()
+loris_client = LorisAPIClient(disk_cache=DiskCache())
 
 # DynamicUniverseProviderを直接作成
 universe = DynamicUniverseProvider(
@@ -54,8 +54,8 @@ print()
 
 if scores:
     print("=== 上位5銘柄のスコア ===")
-    sorted_scores = sorted(scores.values(), key=lambda s: (s.max_fr_spread, s.exchange_count), reverse=True)
-    for i, score in enumerate(sorted_scores[:5], 1):
+    top_scores = heapq.nlargest(5, scores.values(), key=lambda s: (s.max_fr_spread, s.exchange_count))
+    for i, score in enumerate(top_scores, 1):
         print(f"{i}. {score.symbol}: spread={score.max_fr_spread*100:.4f}%, exchanges={score.exchange_count}")
 else:
     print("スコアが0個！")
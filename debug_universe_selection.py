@@ -1,8 +1,5 @@
 """DynamicUniverseProvider デバッグスクリプト"""
 
-import sys
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-
 from funding_arb import (
     FundingArbConfig,
     LorisAPIClient,
@@ -10,6 +7,7 @@ from funding_arb import (
 )
 from funding_arb.config import ExchangeConfig
 from funding_arb.hyperliquid_client import HyperliquidMarketDataAdapter
+from funding_arb.cache import DiskCache
 
 # 設定
 config = FundingArbConfig(
@@ -29,7 +27,7 @@ config = FundingArbConfig(
 )
 
 # クライアント
-loris_client = LorisAPIClient()
+loris_client = LorisAPIClient(disk_cache=DiskCache())
 hl_adapter = HyperliquidMarketDataAdapter(testnet=True)
 
 # HybridMarketDataService
@@ -52,8 +50,10 @@ print()
 # 各銘柄のFRを確認
 if symbols:
     print("=== 各銘柄のFR ===")
-    for symbol in symbols:
-        snapshots = market_data.fetch_funding_snapshots(symbols=[symbol])
-        for snap in snapshots:
-            if snap.exchange == "hyperliquid":
-                print(f"  {symbol} ({snap.exchange}): {snap.funding_rate*100:.4f}%")
+    # 全銘柄を1回で取得（Loris fetch・価格更新とも1回で済む）
+    snapshots = market_data.get_funding_snapshots(
+        exchanges=["hyperliquid"],
+        symbols=symbols,
+    )
+    for snap in snapshots:
+        print(f"  {snap.symbol} ({snap.exchange}): {snap.funding_rate*100:.4f}%")
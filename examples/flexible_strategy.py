@@ -12,6 +12,9 @@
 最適なペアをスコアリングで自動選定。
 """
 
+import heapq
+from operator import itemgetter
+
 from funding_arb import FundingArbConfig, LorisAPIClient, LorisMarketDataService
 from funding_arb.config import ExchangeConfig
 
@@ -79,25 +82,22 @@ def analyze_pair_patterns():
 
     # パターン2: 異なる取引所・同一銘柄
     print("\n【パターン2】異なる取引所・同一銘柄（クラシック）")
-    bitget_symbols = {fr.symbol: fr for fr in bitget_rates}
-    hyper_symbols = {fr.symbol: fr for fr in hyper_rates}
-
-    common_symbols = set(bitget_symbols.keys()) & set(hyper_symbols.keys())
-    classic_pairs = []
-
-    for symbol in common_symbols:
-        bg_rate = bitget_symbols[symbol].rate
-        hl_rate = hyper_symbols[symbol].rate
-
-        # 反対符号のみ
-        if bg_rate * hl_rate < 0:
-            spread = abs(bg_rate - hl_rate)
-            classic_pairs.append((symbol, bg_rate, hl_rate, spread))
-
-    # FR差でソート
-    classic_pairs.sort(key=lambda x: x[3], reverse=True)
+    # 銘柄 → FR の dict 同士の内部結合（小さい方を走査し、大きい方を引く）
+    bg_rate_of = {fr.symbol: fr.rate for fr in bitget_rates}
+    hl_rate_of = {fr.symbol: fr.rate for fr in hyper_rates}
+    smaller, larger = sorted((bg_rate_of, hl_rate_of), key=len)
+
+    # 結合 → 反対符号でフィルタ → FR差を計算、を中間リストなしで流す
+    classic_pairs = (
+        (symbol, bg_rate, hl_rate, abs(bg_rate - hl_rate))
+        for symbol, bg_rate, hl_rate in (
+            (sym, bg_rate_of[sym], hl_rate_of[sym]) for sym in smaller if sym in larger
+        )
+        if bg_rate * hl_rate < 0
+    )
 
-    for symbol, bg_rate, hl_rate, spread in classic_pairs[:3]:
+    # FR差の上位3件（全件ソートは不要）
+    for symbol, bg_rate, hl_rate, spread in heapq.nlargest(3, classic_pairs, key=itemgetter(3)):
         bg_side = "short" if bg_rate > 0 else "long"
         hl_side = "long" if bg_rate > 0 else "short"
         print(f"  {symbol}: Bitget {bg_side}({bg_rate*100:+.3f}%) + Hyperliquid {hl_side}({hl_rate*100:+.3f}%)")
@@ -105,21 +105,26 @@ def analyze_pair_patterns():
 
     # パターン3: 異なる取引所・異なる銘柄
     print("\n【パターン3】異なる取引所・異なる銘柄（クロス戦略）")
-    cross_pairs = []
-
-    for bg_fr in bitget_rates[:10]:
-        for hl_fr in hyper_rates[:10]:
-            if bg_fr.symbol == hl_fr.symbol:
-                continue
-            if bg_fr.rate * hl_fr.rate >= 0:
-                continue
-
-            spread = abs(bg_fr.rate) + abs(hl_fr.rate)
-            cross_pairs.append((bg_fr.symbol, hl_fr.symbol, bg_fr.rate, hl_fr.rate, spread))
-
-    cross_pairs.sort(key=lambda x: x[4], reverse=True)
+    # 属性アクセスと abs() を内側ループから外すため、(銘柄, FR, |FR|) の列を先に作る
+    bg_cols = [(fr.symbol, fr.rate, abs(fr.rate)) for fr in bitget_rates[:10]]
+    hl_cols = [(fr.symbol, fr.rate, abs(fr.rate)) for fr in hyper_rates[:10]]
+
+    # 符号で事前に分割し、反対符号の組み合わせ（正×負、負×正）だけを列挙する
+    bg_pos = [c for c in bg_cols if c[1] > 0]
+    bg_neg = [c for c in bg_cols if c[1] < 0]
+    hl_pos = [c for c in hl_cols if c[1] > 0]
+    hl_neg = [c for c in hl_cols if c[1] < 0]
+
+    # 全件ソートせず、ジェネレータから上位3件だけを取り出す
+    cross_pairs = (
+        (bg_sym, hl_sym, bg_rate, hl_rate, bg_abs + hl_abs)
+        for bg_side, hl_side in ((bg_pos, hl_neg), (bg_neg, hl_pos))
+        for bg_sym, bg_rate, bg_abs in bg_side
+        for hl_sym, hl_rate, hl_abs in hl_side
+        if bg_sym != hl_sym
+    )
 
-    for bg_sym, hl_sym, bg_rate, hl_rate, spread in cross_pairs[:3]:
+    for bg_sym, hl_sym, bg_rate, hl_rate, spread in heapq.nlargest(3, cross_pairs, key=itemgetter(4)):
         bg_side = "short" if bg_rate > 0 else "long"
         hl_side = "long" if bg_rate > 0 else "short"
         print(f"  Bitget {bg_sym} {bg_side}({bg_rate*100:+.3f}%) + Hyperliquid {hl_sym} {hl_side}({hl_rate*100:+.3f}%)")
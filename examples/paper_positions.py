@@ -0,0 +1,31 @@
+"""ペーパートレーディング用のポジション管理
+
+paper_trading_v2.py / paper_trading_with_hyperliquid.py で共有する。
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Position:
+    """ペーパートレードのポジション"""
+    loris_symbol: str  # Loris側のシンボル（"BTC/USDT:USDT" → "BTC"）
+    qty: float = 0.0
+    entry_price: float = 0.0
+    notional: float = 0.0
+
+
+class PositionBook(dict):
+    """(exchange, symbol) → Position の辞書。
+
+    読み取り（``get`` / ``[]``）では登録しない。建玉する書き込み側だけが
+    ``get_or_create`` で空ポジションを登録する。
+    """
+
+    def get_or_create(self, key):
+        """key のポジションを返す。未登録なら空ポジションを登録して返す。"""
+        pos = self.get(key)
+        if pos is None:
+            # Loris側のシンボル（"BTC/USDT:USDT" → "BTC"）は建玉時に1回だけ求める
+            pos = self[key] = Position(key[1].partition("/")[0])
+        return pos
@@ -11,6 +11,7 @@
 
 import time
 from datetime import datetime, timedelta
+from typing import NamedTuple
 from funding_arb import (
     FundingArbConfig,
     FundingArbOrchestrator,
@@ -31,6 +32,11 @@ class PaperTradingClient(ExchangeExecutionClient):
     def __init__(self):
         self.orders = []
         self.positions = {}  # {(exchange, symbol): qty}
+        self._loris_keys = {}  # {(exchange, symbol): (exchange, loris_symbol)}
+        self._open_count = 0  # qty != 0 のポジション数（place_order で増減）
+        # 直近の Loris レスポンスと、そこから作った rate_map
+        self._rate_map_response = None
+        self._rate_map = {}
         self.pnl = 0.0
         self.funding_collected = 0.0
 
@@ -46,7 +52,7 @@ class PaperTradingClient(ExchangeExecutionClient):
             "side": side,
             "qty": qty,
             "price": avg_price,
-            "timestamp": datetime.utcnow(),
+            "timestamp": time.time_ns(),  # エポックからのナノ秒（UTC）
             "average": avg_price,
         }
         self.orders.append(order)
@@ -54,25 +60,42 @@ class PaperTradingClient(ExchangeExecutionClient):
         # ポジションを更新
         key = (exchange, symbol)
         current = self.positions.get(key, 0.0)
+        if key not in self._loris_keys:
+            # シンボルを正規化（CCXT形式 → Loris形式）して保持
+            self._loris_keys[key] = (exchange, symbol.split("/")[0])
 
         if side == "buy":
-            self.positions[key] = current + qty
+            new_qty = current + qty
         else:
-            self.positions[key] = current - qty
+            new_qty = current - qty
+        self.positions[key] = new_qty
+
+        # 0 ↔ 非0 の遷移時だけオープン数を更新
+        self._open_count += bool(new_qty) - bool(current)
 
         print(f"  [PAPER] {exchange} {symbol} {side} {qty:.4f} @ ${avg_price:.2f}")
         return order
 
+    def _get_rate_map(self, response):
+        """response ごとの rate_map を返す（同じ response なら再構築しない）
+
+        LorisAPIClient はTTL内なら同じ LorisResponse を返すため、
+        オブジェクト同一性で判定できる。
+        """
+        if self._rate_map_response is not response:
+            self._rate_map = {(fr.exchange, fr.symbol): fr.rate for fr in response.funding_rates}
+            self._rate_map_response = response
+        return self._rate_map
+
     def simulate_funding_payment(self, loris_client):
         """仮想的なfunding rate収益を計算"""
         response = loris_client.fetch()
-        rate_map = {(fr.exchange, fr.symbol): fr.rate for fr in response.funding_rates}
+        rate_map = self._get_rate_map(response)
 
         funding_pnl = 0.0
-        for (exchange, symbol), qty in self.positions.items():
-            # シンボルを正規化（CCXT形式 → Loris形式）
-            loris_symbol = symbol.split("/")[0]
-            rate = rate_map.get((exchange, loris_symbol), 0.0)
+        loris_keys = self._loris_keys
+        for key, qty in self.positions.items():
+            rate = rate_map.get(loris_keys[key], 0.0)
 
             # qty > 0 = long, qty < 0 = short
             # rate > 0 = long pays short (shortが受取)
@@ -90,51 +113,73 @@ class PaperTradingClient(ExchangeExecutionClient):
     def get_portfolio_summary(self):
         """ポートフォリオサマリー"""
         return {
-            "positions": len([q for q in self.positions.values() if q != 0]),
+            "positions": self._open_count,
             "total_orders": len(self.orders),
             "funding_collected": self.funding_collected,
             "pnl": self.pnl + self.funding_collected,
         }
 
 
+class PaperTradingServices(NamedTuple):
+    """シミュレータが使うサービス一式（モード間で共有できる）"""
+    paper_client: PaperTradingClient
+    loris_client: LorisAPIClient
+    config: FundingArbConfig
+    orch: FundingArbOrchestrator
+
+
+def build_paper_trading_services() -> PaperTradingServices:
+    """ペーパートレーディング用のサービスグラフを構築"""
+    paper_client = PaperTradingClient()
+    loris_client = LorisAPIClient()
+
+    # 設定
+    config = FundingArbConfig(
+        exchanges=[
+            ExchangeConfig("bitget"),
+            ExchangeConfig("hyperliquid"),
+        ],
+        symbols=[],
+        universe_size=20,
+        fr_diff_min=0.002,
+        min_persistence_windows=2,
+        min_pair_score=0.40,
+        expected_edge_min_bps=1.0,
+        max_new_positions_per_cycle=2,
+        max_notional_per_pair_usd=5_000,
+        max_total_notional_usd=30_000,
+    )
+
+    # サービス
+    market_data = LorisMarketDataService(loris_client, config=config)
+    signals = SignalService(config)
+    risk = RiskService(config)
+    execution = ExecutionService(paper_client)
+
+    orch = FundingArbOrchestrator(config, market_data, signals, risk, execution)
+    return PaperTradingServices(paper_client, loris_client, config, orch)
+
+
 class PaperTradingSimulator:
     """ペーパートレーディングシミュレータ"""
 
-    def __init__(self, initial_capital=100_000):
+    def __init__(self, initial_capital=100_000, services=None):
         self.initial_capital = initial_capital
-        self.paper_client = PaperTradingClient()
-        self.loris_client = LorisAPIClient()
-
-        # 設定
-        self.config = FundingArbConfig(
-            exchanges=[
-                ExchangeConfig("bitget"),
-                ExchangeConfig("hyperliquid"),
-            ],
-            symbols=[],
-            universe_size=20,
-            fr_diff_min=0.002,
-            min_persistence_windows=2,
-            min_pair_score=0.40,
-            expected_edge_min_bps=1.0,
-            max_new_positions_per_cycle=2,
-            max_notional_per_pair_usd=5_000,
-            max_total_notional_usd=30_000,
-        )
-
-        # サービス
-        market_data = LorisMarketDataService(self.loris_client, config=self.config)
-        signals = SignalService(self.config)
-        risk = RiskService(self.config)
-        execution = ExecutionService(self.paper_client)
 
-        self.orch = FundingArbOrchestrator(
-            self.config, market_data, signals, risk, execution
-        )
+        # services 未指定時のみサービスグラフを新規構築
+        if services is None:
+            services = build_paper_trading_services()
+        self.paper_client, self.loris_client, self.config, self.orch = services
 
-        self.start_time = datetime.utcnow()
+        # 経過時間は壁時計の変更に影響されない monotonic で測る
+        self._start_ns = time.monotonic_ns()
         self.cycle_count = 0
 
+    @classmethod
+    def from_shared(cls, services, initial_capital=100_000):
+        """構築済みのサービスを再利用してシミュレータを作成"""
+        return cls(initial_capital, services=services)
+
     def run_cycle(self):
         """1サイクル実行"""
         self.cycle_count += 1
@@ -204,7 +249,7 @@ class PaperTradingSimulator:
         """最終サマリー"""
         summary = self.paper_client.get_portfolio_summary()
         final_equity = self.initial_capital + summary["pnl"]
-        duration = datetime.utcnow() - self.start_time
+        duration = timedelta(microseconds=(time.monotonic_ns() - self._start_ns) // 1000)
 
         print(f"\n{'='*70}")
         print("最終結果")
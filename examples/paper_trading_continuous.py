@@ -4,19 +4,19 @@ Ctrl+C で停止するまで実行し続けます。
 リアルタイムでfunding rateを監視し、自動的にペアを選定・実行します。
 """
 
-import time
 import signal
 import sys
-from paper_trading import PaperTradingSimulator
+import threading
+from paper_trading import PaperTradingSimulator, build_paper_trading_services
 
 
 class ContinuousPaperTrading:
     """連続実行用のラッパー"""
 
-    def __init__(self, initial_capital=100_000, cycle_interval_minutes=10):
-        self.simulator = PaperTradingSimulator(initial_capital)
+    def __init__(self, initial_capital=100_000, cycle_interval_minutes=10, simulator=None):
+        self.simulator = simulator or PaperTradingSimulator(initial_capital)
         self.cycle_interval = cycle_interval_minutes * 60  # 秒に変換
-        self.running = True
+        self._stop = threading.Event()
 
         # Ctrl+C のハンドラ設定
         signal.signal(signal.SIGINT, self.handle_interrupt)
@@ -24,7 +24,7 @@ class ContinuousPaperTrading:
     def handle_interrupt(self, signum, frame):
         """Ctrl+C が押されたときの処理"""
         print("\n\n🛑 停止シグナルを受信しました...")
-        self.running = False
+        self._stop.set()
 
     def run(self):
         """連続実行"""
@@ -38,29 +38,22 @@ class ContinuousPaperTrading:
         print("=" * 70)
 
         try:
-            while self.running:
+            while not self._stop.is_set():
                 # 1サイクル実行
                 self.simulator.run_cycle()
 
-                if self.running:
+                if not self._stop.is_set():
                     # 次のサイクルまで待機
                     print(f"\n⏰ 次のサイクルまで {self.cycle_interval // 60}分待機...")
                     print(f"   (Ctrl+C で停止できます)")
 
-                    # 1秒ごとにチェックして中断可能に
-                    for i in range(self.cycle_interval):
-                        if not self.running:
-                            break
-                        time.sleep(1)
-
-                        # 30秒ごとに待機中のメッセージ
-                        if (i + 1) % 30 == 0:
-                            remaining = (self.cycle_interval - i - 1) // 60
-                            print(f"   残り約{remaining}分...")
+                    # 停止シグナルで即座に起きる（1秒ごとのポーリングは不要）
+                    if self._stop.wait(timeout=self.cycle_interval):
+                        break
 
         except KeyboardInterrupt:
             print("\n\n🛑 KeyboardInterrupt を検出")
-            self.running = False
+            self._stop.set()
 
         finally:
             # 最終結果を表示
@@ -83,24 +76,30 @@ def main():
         print("\n\nキャンセルされました。")
         return
 
+    if choice not in ("1", "2"):
+        print("❌ 無効な選択です。")
+        return
+
+    # サービスグラフは選択後に1回だけ構築し、選ばれたモードに渡す
+    simulator = PaperTradingSimulator.from_shared(
+        build_paper_trading_services(), initial_capital=100_000
+    )
+
     if choice == "1":
         # デモモード
         print("\n🎮 デモモード開始")
-        simulator = PaperTradingSimulator(initial_capital=100_000)
         simulator.run_continuous(cycles=10, interval_minutes=10)
 
-    elif choice == "2":
+    else:
         # 連続モード
         print("\n🔄 連続モード開始")
         continuous = ContinuousPaperTrading(
             initial_capital=100_000,
-            cycle_interval_minutes=10
+            cycle_interval_minutes=10,
+            simulator=simulator,
         )
         continuous.run()
 
-    else:
-        print("❌ 無効な選択です。")
-
 
 if __name__ == "__main__":
     main()
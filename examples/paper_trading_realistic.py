@@ -7,7 +7,8 @@
 """
 
 import time
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from funding_arb import (
     FundingArbConfig,
     FundingArbOrchestrator,
@@ -21,6 +22,32 @@ from funding_arb.config import ExchangeConfig
 from funding_arb.types import PortfolioState
 from funding_arb.execution import ExchangeExecutionClient
 
+# 1サイクル10分 = 8時間（funding rate の単位）の1/48
+CYCLES_PER_FUNDING_PERIOD = 48.0
+
+
+@dataclass(slots=True)
+class Position:
+    """ペーパートレードのポジション"""
+    qty: float = 0.0
+    entry_price: float = 0.0
+    notional: float = 0.0
+    slot: int = 0  # レート列のスロット番号
+
+
+def _funding_kernel(positions, rates):
+    """1サイクル分のfunding PnLを合計する
+
+    rates は各ポジションの slot で引ける密なレート列。
+    long は支払い（-）、short は受け取り（+）。符号を notional に畳み込んで
+    1パスで合計し、サイクル換算の除算は最後に1回だけ行う。
+    """
+    total = 0.0
+    for pos in positions:
+        notional = pos.notional
+        total += rates[pos.slot] * (-notional if pos.qty > 0 else notional)
+    return total / CYCLES_PER_FUNDING_PERIOD
+
 
 class RealisticPaperTradingClient(ExchangeExecutionClient):
     """現実的なペーパートレーディングクライアント"""
@@ -28,9 +55,15 @@ class RealisticPaperTradingClient(ExchangeExecutionClient):
     def __init__(self, loris_client):
         self.loris_client = loris_client
         self.orders = []
-        self.positions = {}  # {(exchange, symbol): {"qty": float, "entry_price": float}}
+        self.positions = {}  # {(exchange, symbol): Position}
+        # Loris側のキー (exchange, loris_symbol) → レート列の固定スロット番号
+        self._slot_of_key = {}
+        # 直近に密なレート列を作った (response, スロット数) とその結果
+        self._rates_source = (None, 0)
+        self._rates = []
         self.realized_pnl = 0.0
         self.total_funding_collected = 0.0
+        self._running_notional = 0.0  # 全ポジションの notional 合計（約定ごとに差分更新）
         self.price_cache = {}  # シンボルごとの想定価格
 
     def _get_realistic_price(self, symbol):
@@ -65,7 +98,7 @@ class RealisticPaperTradingClient(ExchangeExecutionClient):
             "side": side,
             "qty": qty,
             "price": avg_price,
-            "timestamp": datetime.utcnow(),
+            "timestamp": time.time_ns(),  # エポックからのナノ秒（UTC）
             "average": avg_price,
         }
         self.orders.append(order)
@@ -73,67 +106,72 @@ class RealisticPaperTradingClient(ExchangeExecutionClient):
         # ポジション更新
         key = (exchange, symbol)
         if key not in self.positions:
-            self.positions[key] = {"qty": 0.0, "entry_price": avg_price, "notional": 0.0}
+            # Loris側のキー（"ETH/USDT:USDT" → "ETH"）は新規ポジション作成時に1回だけ計算し、
+            # レート列のスロットを割り当てる（クローズ後も同じ銘柄は同じスロットを再利用）
+            loris_symbol = symbol.split("/")[0] if "/" in symbol else symbol
+            slot = self._slot_of_key.setdefault((exchange, loris_symbol), len(self._slot_of_key))
+            self.positions[key] = Position(entry_price=avg_price, slot=slot)
 
         pos = self.positions[key]
-        old_qty = pos["qty"]
-
-        if side == "buy":
-            new_qty = old_qty + qty
-            if new_qty != 0:
-                pos["entry_price"] = (
-                    (old_qty * pos["entry_price"] + qty * avg_price) / new_qty
-                )
-            pos["qty"] = new_qty
-        else:
-            new_qty = old_qty - qty
-            if old_qty > 0 and new_qty < old_qty:
-                closed_qty = min(qty, old_qty)
-                self.realized_pnl += closed_qty * (avg_price - pos["entry_price"])
-            pos["qty"] = new_qty
-
-        pos["notional"] = abs(pos["qty"]) * avg_price
+        self._apply_fill(pos, qty if side == "buy" else -qty, avg_price)
 
-        if abs(pos["qty"]) < 1e-6:
+        if abs(pos.qty) < 1e-6:
             del self.positions[key]
         else:
-            print(f"  [PAPER] {exchange} {symbol} {side} {qty:.4f} @ ${avg_price:.2f} (notional: ${pos['notional']:.2f})")
+            print(f"  [PAPER] {exchange} {symbol} {side} {qty:.4f} @ ${avg_price:.2f} (notional: ${pos.notional:.2f})")
 
         return order
 
-    def calculate_funding_pnl(self):
-        """funding rate収益を計算（1サイクルあたり）"""
+    def _apply_fill(self, pos, dq, px):
+        """符号付き数量 dq の約定をポジションに反映する
+
+        同方向（または新規）なら平均建値を更新し、逆方向なら決済分の実現損益を
+        計上する。ドテンした場合は建値を約定価格にリセットする。
+        """
+        q0 = pos.qty
+        qn = q0 + dq
+        if q0 * dq >= 0:
+            pos.entry_price = (q0 * pos.entry_price + dq * px) / qn if qn else 0.0
+        else:
+            closed = min(abs(dq), abs(q0))
+            self.realized_pnl += closed * (px - pos.entry_price) * (1 if q0 > 0 else -1)
+            if abs(qn) > abs(q0):
+                pos.entry_price = px
+        new_notional = abs(qn) * px
+        self._running_notional += new_notional - pos.notional
+        pos.qty = qn
+        pos.notional = new_notional
+
+    def _get_rates(self, response):
+        """スロット順の密なレート列を返す
+
+        全銘柄の rate_map は作らず、保有したことのある銘柄のスロットだけを埋める。
+        LorisAPIClient はTTL内なら同じ LorisResponse を返すため、
+        同じ response かつスロットが増えていなければ前回の結果を再利用する。
+        """
+        slot_of_key = self._slot_of_key
+        cached_response, cached_slots = self._rates_source
+        if cached_response is not response or cached_slots != len(slot_of_key):
+            rates = [0.0] * len(slot_of_key)
+            for fr in response.funding_rates:
+                slot = slot_of_key.get((fr.exchange, fr.symbol))
+                if slot is not None:
+                    rates[slot] = fr.rate
+            self._rates = rates
+            self._rates_source = (response, len(slot_of_key))
+        return self._rates
+
+    def calculate_funding_pnl(self, response=None):
+        """funding rate収益を計算（1サイクルあたり）
+
+        response を渡した場合はそれを使い、Loris APIを再取得しない。
+        """
         if not self.positions:
             return 0.0
 
-        response = self.loris_client.fetch()
-        rate_map = {}
-
-        for fr in response.funding_rates:
-            rate_map[(fr.exchange, fr.symbol)] = fr.rate
-
-        funding_pnl = 0.0
-
-        for (exchange, symbol), pos in self.positions.items():
-            loris_symbol = symbol.split("/")[0] if "/" in symbol else symbol
-            rate = rate_map.get((exchange, loris_symbol), 0.0)
-
-            if rate == 0.0:
-                continue
-
-            qty = pos["qty"]
-            notional = pos.get("notional", 0.0)
-
-            # funding rateは8時間あたり
-            # 1サイクル10分 = 1/48 of 8時間
-            cycle_rate = rate / 48.0
-
-            if qty > 0:  # long
-                payment = -cycle_rate * notional
-            else:  # short
-                payment = cycle_rate * notional
-
-            funding_pnl += payment
+        if response is None:
+            response = self.loris_client.fetch()
+        funding_pnl = _funding_kernel(self.positions.values(), self._get_rates(response))
 
         self.total_funding_collected += funding_pnl
         return funding_pnl
@@ -148,11 +186,10 @@ class RealisticPaperTradingClient(ExchangeExecutionClient):
 
     def get_portfolio_summary(self):
         """ポートフォリオサマリー"""
-        total_notional = sum(p.get("notional", 0) for p in self.positions.values())
         return {
             "positions": len(self.positions),
             "total_orders": len(self.orders),
-            "total_notional": total_notional,
+            "total_notional": self._running_notional,
             "realized_pnl": self.realized_pnl,
             "unrealized_pnl": self.calculate_unrealized_pnl(),
             "funding_collected": self.total_funding_collected,
@@ -165,7 +202,8 @@ class RealisticPaperTradingSimulator:
 
     def __init__(self, initial_capital=100_000):
         self.initial_capital = initial_capital
-        self.loris_client = LorisAPIClient()
+        # サイクル内の複数回の fetch() を1回のHTTPにまとめるためTTLを明示
+        self.loris_client = LorisAPIClient(cache_ttl=60.0)
         self.paper_client = RealisticPaperTradingClient(self.loris_client)
 
         self.config = FundingArbConfig(
@@ -193,7 +231,8 @@ class RealisticPaperTradingSimulator:
             self.config, market_data, signals, risk, execution
         )
 
-        self.start_time = datetime.utcnow()
+        # 経過時間は壁時計の変更に影響されない monotonic で測る
+        self._start_ns = time.monotonic_ns()
         self.cycle_count = 0
 
     def run_cycle(self):
@@ -204,8 +243,12 @@ class RealisticPaperTradingSimulator:
         print(f"サイクル #{self.cycle_count} - {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*70}")
 
+        # Loris APIはサイクル内で1回だけ取得し、Funding計算と銘柄選定で共有する
+        # （orchestrator側の fetch() はTTL内のクライアントキャッシュに当たる）
+        response = self.loris_client.fetch()
+
         # Funding収益計算
-        funding_pnl = self.paper_client.calculate_funding_pnl()
+        funding_pnl = self.paper_client.calculate_funding_pnl(response)
 
         # ポートフォリオ状態
         summary = self.paper_client.get_portfolio_summary()
@@ -260,7 +303,7 @@ class RealisticPaperTradingSimulator:
         """最終サマリー"""
         summary = self.paper_client.get_portfolio_summary()
         final_equity = self.initial_capital + summary["total_pnl"]
-        duration = datetime.utcnow() - self.start_time
+        duration = timedelta(microseconds=(time.monotonic_ns() - self._start_ns) // 1000)
 
         print(f"\n{'='*70}")
         print("最終結果")
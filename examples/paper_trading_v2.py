@@ -13,6 +13,7 @@ from funding_arb import (
     FundingArbOrchestrator,
     LorisAPIClient,
     LorisMarketDataService,
+    LorisRateMapCache,
     SignalService,
     RiskService,
     ExecutionService,
@@ -20,6 +21,29 @@ from funding_arb import (
 from funding_arb.config import ExchangeConfig
 from funding_arb.types import PortfolioState
 from funding_arb.execution import ExchangeExecutionClient
+from paper_positions import PositionBook
+
+
+# 1サイクル10分 = 8時間（funding rate の単位）の1/48
+CYCLES_PER_FUNDING_PERIOD = 48.0
+
+
+# 設定（シミュレータ間で共有。生成後に変更しないこと）
+_PAPER_V2_CONFIG = FundingArbConfig(
+    exchanges=[
+        ExchangeConfig("bitget"),
+        ExchangeConfig("hyperliquid"),
+    ],
+    symbols=[],
+    universe_size=20,
+    fr_diff_min=0.002,
+    min_persistence_windows=2,
+    min_pair_score=0.40,
+    expected_edge_min_bps=1.0,
+    max_new_positions_per_cycle=2,
+    max_notional_per_pair_usd=5_000,
+    max_total_notional_usd=30_000,
+)
 
 
 class ImprovedPaperTradingClient(ExchangeExecutionClient):
@@ -27,8 +51,10 @@ class ImprovedPaperTradingClient(ExchangeExecutionClient):
 
     def __init__(self, loris_client):
         self.loris_client = loris_client
+        # レート辞書は1時間TTLで共有（funding rate の更新頻度より十分短い）
+        self.rate_cache = LorisRateMapCache(loris_client, ttl=3600.0)
         self.orders = []
-        self.positions = {}  # {(exchange, symbol): {"qty": float, "entry_price": float}}
+        self.positions = PositionBook()  # {(exchange, symbol): Position}
         self.realized_pnl = 0.0
         self.total_funding_collected = 0.0
         self.cycle_count = 0
@@ -45,40 +71,39 @@ class ImprovedPaperTradingClient(ExchangeExecutionClient):
             "side": side,
             "qty": qty,
             "price": avg_price,
-            "timestamp": datetime.utcnow(),
+            "timestamp": time.time_ns(),  # エポックからのナノ秒（UTC）
             "average": avg_price,
         }
         self.orders.append(order)
 
         # ポジション更新
         key = (exchange, symbol)
-        if key not in self.positions:
-            self.positions[key] = {"qty": 0.0, "entry_price": avg_price, "notional": 0.0}
-
-        pos = self.positions[key]
-        old_qty = pos["qty"]
+        pos = self.positions.get_or_create(key)
+        old_qty = pos.qty
+        if old_qty == 0.0:
+            pos.entry_price = avg_price
 
         if side == "buy":
             new_qty = old_qty + qty
             # 加重平均エントリー価格
             if new_qty != 0:
-                pos["entry_price"] = (
-                    (old_qty * pos["entry_price"] + qty * avg_price) / new_qty
+                pos.entry_price = (
+                    (old_qty * pos.entry_price + qty * avg_price) / new_qty
                 )
-            pos["qty"] = new_qty
+            pos.qty = new_qty
         else:  # sell
             new_qty = old_qty - qty
             # 決済の場合、実現損益を計算
             if old_qty > 0 and new_qty < old_qty:  # long を決済
                 closed_qty = min(qty, old_qty)
-                self.realized_pnl += closed_qty * (avg_price - pos["entry_price"])
-            pos["qty"] = new_qty
+                self.realized_pnl += closed_qty * (avg_price - pos.entry_price)
+            pos.qty = new_qty
 
         # notionalを更新
-        pos["notional"] = abs(pos["qty"]) * avg_price
+        pos.notional = abs(pos.qty) * avg_price
 
         # ポジションがゼロなら削除
-        if abs(pos["qty"]) < 1e-6:
+        if abs(pos.qty) < 1e-6:
             del self.positions[key]
 
         print(f"  [PAPER] {exchange} {symbol} {side} {qty:.2f} @ ${avg_price:.2f}")
@@ -86,75 +111,61 @@ class ImprovedPaperTradingClient(ExchangeExecutionClient):
 
     def calculate_funding_pnl(self):
         """funding rate収益を計算（毎サイクル）"""
-        response = self.loris_client.fetch()
-        rate_map = {}
-
-        for fr in response.funding_rates:
-            # CCXTシンボルをLorisシンボルに変換
-            loris_symbol = fr.symbol
-            rate_map[(fr.exchange, loris_symbol)] = fr.rate
-
-        funding_pnl = 0.0
-
-        for (exchange, symbol), pos in self.positions.items():
-            # シンボルを正規化
-            loris_symbol = symbol.split("/")[0] if "/" in symbol else symbol
-
-            rate = rate_map.get((exchange, loris_symbol), 0.0)
-            if rate == 0.0:
-                continue
-
-            qty = pos["qty"]
-            notional = pos.get("notional", abs(qty) * 100)
-
-            # funding rate は8時間あたり
-            # 1サイクル（10分）あたりの収益: rate * notional * (10/480)
-            # ここでは簡易的に rate * notional / 48 とする
-            cycle_rate = rate / 48.0  # 8時間 = 48 * 10分
-
-            if qty > 0:  # long
-                # rate > 0 なら支払い、rate < 0 なら受取
-                payment = -cycle_rate * notional
-            else:  # short
-                # rate > 0 なら受取、rate < 0 なら支払い
-                payment = cycle_rate * notional
+        # ポジションが無ければ収益は0。レート取得（HTTP）も不要
+        if not self.positions:
+            return 0.0
+
+        rate_map = self.rate_cache.get()
+
+        # long は rate > 0 で支払い、short は rate > 0 で受取。符号付き notional
+        # に畳んで分岐をなくし、1サイクル（10分 = 8時間の1/48）への換算は
+        # ループ外で1回だけ行う
+        signed_sum = sum(
+            # レートが無い（0.0）ポジションは0を足すだけなので分岐で飛ばさない
+            (rate_map.get((exchange, pos.loris_symbol), 0.0)
+             * (-pos.notional if pos.qty > 0 else pos.notional)
+             for (exchange, _symbol), pos in self.positions.items()),
+            0.0,
+        )
 
-            funding_pnl += payment
+        funding_pnl = signed_sum / CYCLES_PER_FUNDING_PERIOD
 
         self.total_funding_collected += funding_pnl
         return funding_pnl
 
     def calculate_unrealized_pnl(self):
         """未実現損益を計算"""
-        unrealized = 0.0
         # 現在価格は簡易的に100.0固定（本来はLorisまたはCCXTから取得）
         current_price = 100.0
 
-        for (exchange, symbol), pos in self.positions.items():
-            qty = pos["qty"]
-            entry_price = pos["entry_price"]
-
-            if qty > 0:  # long
-                unrealized += qty * (current_price - entry_price)
-            else:  # short
-                unrealized += abs(qty) * (entry_price - current_price)
+        # short の abs(qty) * (entry - current) は qty * (current - entry) と
+        # 等しいので、long/short を同じ式で1パス集計できる
+        return sum(
+            (pos.qty * (current_price - pos.entry_price)
+             for pos in self.positions.values()),
+            0.0,
+        )
 
-        return unrealized
+    def get_total_pnl(self, unrealized=None):
+        """総PnL = 実現 + 未実現 + funding
 
-    def get_total_pnl(self):
-        """総PnL = 実現 + 未実現 + funding"""
-        unrealized = self.calculate_unrealized_pnl()
+        unrealized を渡した場合は未実現損益の再計算を省く。
+        """
+        if unrealized is None:
+            unrealized = self.calculate_unrealized_pnl()
         return self.realized_pnl + unrealized + self.total_funding_collected
 
     def get_portfolio_summary(self):
         """ポートフォリオサマリー"""
+        # 未実現損益はポジション全走査なので1回だけ計算して使い回す
+        unrealized = self.calculate_unrealized_pnl()
         return {
             "positions": len(self.positions),
             "total_orders": len(self.orders),
             "realized_pnl": self.realized_pnl,
-            "unrealized_pnl": self.calculate_unrealized_pnl(),
+            "unrealized_pnl": unrealized,
             "funding_collected": self.total_funding_collected,
-            "total_pnl": self.get_total_pnl(),
+            "total_pnl": self.get_total_pnl(unrealized),
         }
 
 
@@ -166,22 +177,7 @@ class ImprovedPaperTradingSimulator:
         self.loris_client = LorisAPIClient()
         self.paper_client = ImprovedPaperTradingClient(self.loris_client)
 
-        # 設定
-        self.config = FundingArbConfig(
-            exchanges=[
-                ExchangeConfig("bitget"),
-                ExchangeConfig("hyperliquid"),
-            ],
-            symbols=[],
-            universe_size=20,
-            fr_diff_min=0.002,
-            min_persistence_windows=2,
-            min_pair_score=0.40,
-            expected_edge_min_bps=1.0,
-            max_new_positions_per_cycle=2,
-            max_notional_per_pair_usd=5_000,
-            max_total_notional_usd=30_000,
-        )
+        self.config = _PAPER_V2_CONFIG
 
         # サービス
         market_data = LorisMarketDataService(self.loris_client, config=self.config)
@@ -193,8 +189,11 @@ class ImprovedPaperTradingSimulator:
             self.config, market_data, signals, risk, execution
         )
 
-        self.start_time = datetime.utcnow()
+        # 経過時間は壁時計の変更に影響されない monotonic で測る
+        self._start_ns = time.monotonic_ns()
         self.cycle_count = 0
+        # 直近サイクル終了時点のサマリー（最終結果の表示で再集計しないため）
+        self._last_summary = None
 
     def run_cycle(self):
         """1サイクル実行"""
@@ -215,7 +214,7 @@ class ImprovedPaperTradingSimulator:
         portfolio = PortfolioState(
             equity=current_equity,
             peak_equity=max(self.initial_capital, current_equity),
-            gross_notional_usd=sum(p.get("notional", 0) for p in self.paper_client.positions.values()),
+            gross_notional_usd=sum(p.notional for p in self.paper_client.positions.values()),
             net_delta_usd=0.0,
             exchange_notionals={},
         )
@@ -233,8 +232,10 @@ class ImprovedPaperTradingSimulator:
         if funding_pnl != 0:
             print(f"\n💰 今サイクルのFunding収益: ${funding_pnl:.2f}")
 
-        # 詳細サマリー
-        summary = self.paper_client.get_portfolio_summary()
+        # 詳細サマリー（今サイクルで注文が出た場合のみ再集計）
+        if len(self.paper_client.orders) != summary["total_orders"]:
+            summary = self.paper_client.get_portfolio_summary()
+        self._last_summary = summary
         print(f"\nポートフォリオ:")
         print(f"  エクイティ: ${current_equity:,.2f}")
         print(f"  オープンポジション: {summary['positions']}")
@@ -262,9 +263,11 @@ class ImprovedPaperTradingSimulator:
 
     def print_final_summary(self):
         """最終サマリー"""
-        summary = self.paper_client.get_portfolio_summary()
+        summary = self._last_summary
+        if summary is None:  # サイクル未実行
+            summary = self.paper_client.get_portfolio_summary()
         final_equity = self.initial_capital + summary["total_pnl"]
-        duration = datetime.utcnow() - self.start_time
+        duration = timedelta(microseconds=(time.monotonic_ns() - self._start_ns) // 1000)
 
         print(f"\n{'='*70}")
         print("最終結果")
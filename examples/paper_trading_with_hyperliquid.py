@@ -4,18 +4,13 @@
 実際のmark_priceでペーパートレーディングを実行します。
 """
 
-import sys
-import os
-
-# hyperliquid-botのsrcパスを追加
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from funding_arb import (
     FundingArbConfig,
     FundingArbOrchestrator,
     LorisAPIClient,
+    LorisRateMapCache,
     HybridMarketDataService,
     SignalService,
     RiskService,
@@ -23,20 +18,29 @@ from funding_arb import (
 )
 from funding_arb.config import ExchangeConfig
 from funding_arb.types import PortfolioState
+from funding_arb.http_session import get_session
 from funding_arb.hyperliquid_client import HyperliquidMarketDataAdapter
 from funding_arb.execution import ExchangeExecutionClient
+from paper_positions import PositionBook
+
+
+# 1サイクル10分 = 8時間（funding rate の単位）の1/48
+CYCLES_PER_FUNDING_PERIOD = 48.0
 
 
 class PaperTradingClient(ExchangeExecutionClient):
     """ペーパートレーディング用クライアント（実際の価格を使用）"""
 
-    def __init__(self, hl_adapter):
+    def __init__(self, hl_adapter, loris_client):
         self.hl_adapter = hl_adapter
         self.orders = []
-        self.positions = {}
+        self.positions = PositionBook()
         self.realized_pnl = 0.0
         self.total_funding_collected = 0.0
-        self.loris_client = LorisAPIClient()
+        # シミュレータと同じクライアント（HTTPセッション・キャッシュ）を共有する
+        self.loris_client = loris_client
+        # レート辞書は1時間TTLで共有（funding rate の更新頻度より十分短い）
+        self.rate_cache = LorisRateMapCache(self.loris_client, ttl=3600.0)
 
     def place_order(self, exchange, symbol, side, qty, order_type, reduce_only, client_order_id):
         """仮想注文を実行（実際の価格を使用）"""
@@ -54,41 +58,40 @@ class PaperTradingClient(ExchangeExecutionClient):
             "side": side,
             "qty": qty,
             "price": avg_price,
-            "timestamp": datetime.utcnow(),
+            "timestamp": time.time_ns(),  # エポックからのナノ秒（UTC）
             "average": avg_price,
         }
         self.orders.append(order)
 
         # ポジション更新
         key = (exchange, symbol)
-        if key not in self.positions:
-            self.positions[key] = {"qty": 0.0, "entry_price": avg_price, "notional": 0.0}
-
-        pos = self.positions[key]
-        old_qty = pos["qty"]
+        pos = self.positions.get_or_create(key)
+        old_qty = pos.qty
+        if old_qty == 0.0:
+            pos.entry_price = avg_price
 
         if side == "buy":
             new_qty = old_qty + qty
             if new_qty != 0:
-                pos["entry_price"] = (
-                    (old_qty * pos["entry_price"] + qty * avg_price) / new_qty
+                pos.entry_price = (
+                    (old_qty * pos.entry_price + qty * avg_price) / new_qty
                 )
-            pos["qty"] = new_qty
+            pos.qty = new_qty
         else:
             new_qty = old_qty - qty
             if old_qty > 0 and new_qty < old_qty:
                 closed_qty = min(qty, old_qty)
-                self.realized_pnl += closed_qty * (avg_price - pos["entry_price"])
-            pos["qty"] = new_qty
+                self.realized_pnl += closed_qty * (avg_price - pos.entry_price)
+            pos.qty = new_qty
 
-        pos["notional"] = abs(pos["qty"]) * avg_price
+        pos.notional = abs(pos.qty) * avg_price
 
-        if abs(pos["qty"]) < 1e-6:
+        if abs(pos.qty) < 1e-6:
             del self.positions[key]
         else:
             # 価格が小さい場合は8桁表示
             price_fmt = f"${avg_price:.8f}" if avg_price < 0.01 else f"${avg_price:.2f}"
-            print(f"  [PAPER] {exchange} {symbol} {side} {qty:.4f} @ {price_fmt} (notional: ${pos['notional']:.2f})")
+            print(f"  [PAPER] {exchange} {symbol} {side} {qty:.4f} @ {price_fmt} (notional: ${pos.notional:.2f})")
 
         return order
 
@@ -104,33 +107,19 @@ class PaperTradingClient(ExchangeExecutionClient):
         if not self.positions:
             return 0.0
 
-        response = self.loris_client.fetch()
-        rate_map = {}
-
-        for fr in response.funding_rates:
-            rate_map[(fr.exchange, fr.symbol)] = fr.rate
+        rate_map = self.rate_cache.get()
 
-        funding_pnl = 0.0
-
-        for (exchange, symbol), pos in self.positions.items():
-            loris_symbol = symbol.split("/")[0] if "/" in symbol else symbol
-            rate = rate_map.get((exchange, loris_symbol), 0.0)
-
-            if rate == 0.0:
-                continue
-
-            qty = pos["qty"]
-            notional = pos.get("notional", 0.0)
-
-            # 1サイクル10分 = 1/48 of 8時間
-            cycle_rate = rate / 48.0
-
-            if qty > 0:  # long
-                payment = -cycle_rate * notional
-            else:  # short
-                payment = cycle_rate * notional
+        # long は rate > 0 で支払い、short は受取。符号付き notional に畳み、
+        # 1サイクル10分 = 1/48 of 8時間 への換算はループ外で1回だけ行う
+        signed_sum = sum(
+            # レートが無い（0.0）ポジションは0を足すだけなので分岐で飛ばさない
+            (rate_map.get((exchange, pos.loris_symbol), 0.0)
+             * (-pos.notional if pos.qty > 0 else pos.notional)
+             for (exchange, _symbol), pos in self.positions.items()),
+            0.0,
+        )
 
-            funding_pnl += payment
+        funding_pnl = signed_sum / CYCLES_PER_FUNDING_PERIOD
 
         self.total_funding_collected += funding_pnl
         return funding_pnl
@@ -141,7 +130,7 @@ class PaperTradingClient(ExchangeExecutionClient):
 
     def get_portfolio_summary(self):
         """ポートフォリオサマリー"""
-        total_notional = sum(p.get("notional", 0) for p in self.positions.values())
+        total_notional = sum(p.notional for p in self.positions.values())
         return {
             "positions": len(self.positions),
             "total_orders": len(self.orders),
@@ -157,13 +146,13 @@ class HyperliquidPaperTradingSimulator:
 
     def __init__(self, initial_capital=100_000):
         self.initial_capital = initial_capital
-        self.loris_client = LorisAPIClient()
+        self.loris_client = LorisAPIClient(session=get_session())
 
         # Hyperliquid Market Data Adapter
-        self.hl_adapter = HyperliquidMarketDataAdapter(testnet=True)
+        self.hl_adapter = HyperliquidMarketDataAdapter(testnet=True, session=get_session())
 
         # ペーパートレーディングクライアント
-        self.paper_client = PaperTradingClient(self.hl_adapter)
+        self.paper_client = PaperTradingClient(self.hl_adapter, self.loris_client)
 
         # 設定
         self.config = FundingArbConfig(
@@ -197,7 +186,8 @@ class HyperliquidPaperTradingSimulator:
             self.config, market_data, signals, risk, execution
         )
 
-        self.start_time = datetime.utcnow()
+        # 経過時間は壁時計の変更に影響されない monotonic で測る
+        self._start_ns = time.monotonic_ns()
         self.cycle_count = 0
 
     def run_cycle(self):
@@ -264,7 +254,7 @@ class HyperliquidPaperTradingSimulator:
         """最終サマリー"""
         summary = self.paper_client.get_portfolio_summary()
         final_equity = self.initial_capital + summary["total_pnl"]
-        duration = datetime.utcnow() - self.start_time
+        duration = timedelta(microseconds=(time.monotonic_ns() - self._start_ns) // 1000)
 
         print(f"\n{'='*70}")
         print("最終結果")
@@ -3,11 +3,6 @@
 10分ごとに自動実行し、Ctrl+Cで停止するまで継続します。
 """
 
-import sys
-import os
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 import time
 from datetime import datetime
 from funding_arb import (
@@ -21,22 +16,23 @@ from funding_arb import (
 )
 from funding_arb.config import ExchangeConfig
 from funding_arb.types import PortfolioState
+from funding_arb.http_session import get_session
 from funding_arb.hyperliquid_client import HyperliquidMarketDataAdapter, HyperliquidExecutionClient
 
-print("=" * 70, flush=True)
-print("本番環境 連続実行モード", flush=True)
-print("=" * 70, flush=True)
-print("初期資金: $50", flush=True)
-print("1ペアあたり: 最大$20", flush=True)
-print("サイクル間隔: 10分", flush=True)
-print("停止方法: Ctrl+C", flush=True)
-print("=" * 70, flush=True)
+print(f"""{'=' * 70}
+本番環境 連続実行モード
+{'=' * 70}
+初期資金: $50
+1ペアあたり: 最大$20
+サイクル間隔: 10分
+停止方法: Ctrl+C
+{'=' * 70}""", flush=True)
 
 # 初期化
 print("\n[初期化中...]", flush=True)
-loris_client = LorisAPIClient()
-hl_adapter = HyperliquidMarketDataAdapter(testnet=False)
-hl_exec = HyperliquidExecutionClient(testnet=False)
+loris_client = LorisAPIClient(session=get_session())
+hl_adapter = HyperliquidMarketDataAdapter(testnet=False, session=get_session())
+hl_exec = HyperliquidExecutionClient(testnet=False, price_source=hl_adapter)
 
 config = FundingArbConfig(
     exchanges=[ExchangeConfig("hyperliquid")],
@@ -70,14 +66,15 @@ print("[初期化完了]", flush=True)
 cycle_count = 0
 start_time = datetime.utcnow()
 total_executed = 0
+# サイクル開始時刻の基準（sleep(600) の積み重ねで実行時間分ずれていかないよう、
+# 毎回 anchor + cycle_count * 600 の締切まで待つ）
+anchor = time.monotonic()
 
 try:
     while True:
         cycle_count += 1
 
-        print("\n" + "=" * 70, flush=True)
-        print(f"サイクル #{cycle_count} - {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
-        print("=" * 70, flush=True)
+        print(f"\n{'=' * 70}\nサイクル #{cycle_count} - {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}\n{'=' * 70}", flush=True)
 
         # ポートフォリオ状態（簡易版）
         portfolio = PortfolioState(
@@ -92,16 +89,20 @@ try:
         try:
             result = orch.run_cycle(portfolio, {})
 
-            print(f"\n結果:", flush=True)
-            print(f"  候補ペア: {result.candidates}", flush=True)
-            print(f"  エントリー意図: {result.intents}", flush=True)
-            print(f"  実行済み: {result.executed}", flush=True)
-            print(f"  ブロック: {result.blocked}", flush=True)
+            # 結果ブロックはまとめて1回の書き込み・flushで出力する
+            lines = [
+                "\n結果:",
+                f"  候補ペア: {result.candidates}",
+                f"  エントリー意図: {result.intents}",
+                f"  実行済み: {result.executed}",
+                f"  ブロック: {result.blocked}",
+            ]
 
             total_executed += result.executed
 
             if result.executed > 0:
-                print(f"\n⚠️  {result.executed}件の注文を実行しました", flush=True)
+                lines.append(f"\n⚠️  {result.executed}件の注文を実行しました")
+            print("\n".join(lines), flush=True)
 
         except Exception as e:
             print(f"\n✗ サイクルエラー: {e}", flush=True)
@@ -110,29 +111,39 @@ try:
 
         # 累計統計
         duration = datetime.utcnow() - start_time
-        print(f"\n累計統計:", flush=True)
-        print(f"  実行時間: {duration}", flush=True)
-        print(f"  総サイクル数: {cycle_count}", flush=True)
-        print(f"  総注文数: {total_executed}", flush=True)
+        lines = [
+            "\n累計統計:",
+            f"  実行時間: {duration}",
+            f"  総サイクル数: {cycle_count}",
+            f"  総注文数: {total_executed}",
+        ]
 
         # 10分待機
         if cycle_count == 1:
-            print(f"\n次のサイクルまで10分待機中...", flush=True)
-            print(f"  (Ctrl+Cで停止)", flush=True)
+            lines.append("\n次のサイクルまで10分待機中...")
+            lines.append("  (Ctrl+Cで停止)")
+        print("\n".join(lines), flush=True)
 
-        time.sleep(600)  # 10分 = 600秒
+        sleep_for = anchor + cycle_count * 600 - time.monotonic()  # 10分 = 600秒
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+        else:
+            print(f"\n⚠️  次サイクルの予定時刻を{-sleep_for:.0f}秒超過しています。待機せず次へ進みます", flush=True)
 
 except KeyboardInterrupt:
-    print("\n\n" + "=" * 70, flush=True)
-    print("停止シグナルを受信しました", flush=True)
-    print("=" * 70, flush=True)
+    print(f"\n\n{'=' * 70}\n停止シグナルを受信しました\n{'=' * 70}", flush=True)
 
     duration = datetime.utcnow() - start_time
-    print(f"\n最終統計:", flush=True)
-    print(f"  実行時間: {duration}", flush=True)
-    print(f"  総サイクル数: {cycle_count}", flush=True)
-    print(f"  総注文数: {total_executed}", flush=True)
-    print("\n正常に停止しました", flush=True)
+    print(
+        "\n".join([
+            "\n最終統計:",
+            f"  実行時間: {duration}",
+            f"  総サイクル数: {cycle_count}",
+            f"  総注文数: {total_executed}",
+            "\n正常に停止しました",
+        ]),
+        flush=True,
+    )
 
 except Exception as e:
     print(f"\n✗ 予期しないエラー: {e}", flush=True)
@@ -1,8 +1,5 @@
 """シンプルな本番環境テスト（1サイクルのみ）"""
 
-import sys
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-
 from datetime import datetime
 from funding_arb import (
     FundingArbConfig,
@@ -15,21 +12,20 @@ from funding_arb import (
 )
 from funding_arb.config import ExchangeConfig
 from funding_arb.types import PortfolioState
+from funding_arb.http_session import get_session
 from funding_arb.hyperliquid_client import HyperliquidMarketDataAdapter, HyperliquidExecutionClient
 
-print("=" * 70, flush=True)
-print("本番環境 1サイクルテスト", flush=True)
-print("=" * 70, flush=True)
+print(f"{'=' * 70}\n本番環境 1サイクルテスト\n{'=' * 70}", flush=True)
 
 # 初期化
 print("\n[1/5] LorisAPIClient初期化...", flush=True)
-loris_client = LorisAPIClient()
+loris_client = LorisAPIClient(session=get_session())
 
 print("[2/5] HyperliquidMarketDataAdapter初期化...", flush=True)
-hl_adapter = HyperliquidMarketDataAdapter(testnet=False)
+hl_adapter = HyperliquidMarketDataAdapter(testnet=False, session=get_session())
 
 print("[3/5] HyperliquidExecutionClient初期化...", flush=True)
-hl_exec = HyperliquidExecutionClient(testnet=False)
+hl_exec = HyperliquidExecutionClient(testnet=False, price_source=hl_adapter)
 
 print("[4/5] 設定とサービス初期化...", flush=True)
 config = FundingArbConfig(
@@ -61,9 +57,7 @@ orch = FundingArbOrchestrator(config, market_data, signals, risk, execution)
 print("[5/5] 初期化完了", flush=True)
 
 # 1サイクル実行
-print("\n" + "=" * 70, flush=True)
-print(f"サイクル実行中 - {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}", flush=True)
-print("=" * 70, flush=True)
+print(f"\n{'=' * 70}\nサイクル実行中 - {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}\n{'=' * 70}", flush=True)
 
 portfolio = PortfolioState(
     equity=50.0,
@@ -75,12 +69,16 @@ portfolio = PortfolioState(
 
 result = orch.run_cycle(portfolio, {})
 
-print("\n結果:", flush=True)
-print(f"  候補ペア: {result.candidates}", flush=True)
-print(f"  エントリー意図: {result.intents}", flush=True)
-print(f"  実行済み: {result.executed}", flush=True)
-print(f"  ブロック: {result.blocked}", flush=True)
+# 結果ブロックはまとめて1回の書き込み・flushで出力する
+print(
+    "\n".join([
+        "\n結果:",
+        f"  候補ペア: {result.candidates}",
+        f"  エントリー意図: {result.intents}",
+        f"  実行済み: {result.executed}",
+        f"  ブロック: {result.blocked}",
+    ]),
+    flush=True,
+)
 
-print("\n" + "=" * 70, flush=True)
-print("テスト完了！", flush=True)
-print("=" * 70, flush=True)
+print(f"\n{'=' * 70}\nテスト完了！\n{'=' * 70}", flush=True)
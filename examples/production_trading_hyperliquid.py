@@ -7,11 +7,7 @@
 """
 
 import sys
-import os
-
-# hyperliquid-botのsrcパスを追加
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
-
+import threading
 import time
 from datetime import datetime
 from funding_arb import (
@@ -25,8 +21,14 @@ from funding_arb import (
 )
 from funding_arb.config import ExchangeConfig
 from funding_arb.types import PortfolioState
+from funding_arb.http_session import get_session
 from funding_arb.hyperliquid_client import HyperliquidMarketDataAdapter, HyperliquidExecutionClient
 
+# Hyperliquid の funding は1時間ごと（毎正時）
+FUNDING_INTERVAL_SECONDS = 3600
+# align_to_funding=True のとき、funding 時刻の何分前に起床するか
+FUNDING_WAKE_OFFSET_MINUTES = 2
+
 
 class ProductionTradingSimulator:
     """本番環境取引システム"""
@@ -47,12 +49,12 @@ class ProductionTradingSimulator:
             sys.exit(0)
 
         self.initial_capital = initial_capital
-        self.loris_client = LorisAPIClient()
+        self.loris_client = LorisAPIClient(session=get_session())
 
         # Hyperliquid 本番環境
         print("\n[初期化] Hyperliquid MarketDataAdapter初期化中...", flush=True)
         try:
-            self.hl_adapter = HyperliquidMarketDataAdapter(testnet=False)
+            self.hl_adapter = HyperliquidMarketDataAdapter(testnet=False, session=get_session())
             print("[初期化] MarketDataAdapter完了", flush=True)
         except Exception as e:
             print(f"[エラー] MarketDataAdapter初期化失敗: {e}", flush=True)
@@ -60,7 +62,7 @@ class ProductionTradingSimulator:
 
         print("[初期化] Hyperliquid ExecutionClient初期化中...", flush=True)
         try:
-            self.hl_exec = HyperliquidExecutionClient(testnet=False)
+            self.hl_exec = HyperliquidExecutionClient(testnet=False, price_source=self.hl_adapter)
             print("[初期化] ExecutionClient完了", flush=True)
         except Exception as e:
             print(f"[エラー] ExecutionClient初期化失敗: {e}", flush=True)
@@ -100,6 +102,8 @@ class ProductionTradingSimulator:
 
         self.start_time = datetime.utcnow()
         self.cycle_count = 0
+        # request_cycle() で待機を打ち切り、次のサイクルを即座に実行する
+        self._wake = threading.Event()
 
         print("[初期化完了] 取引準備完了", flush=True)
 
@@ -139,10 +143,41 @@ class ProductionTradingSimulator:
         if result.executed > 0:
             print(f"\n⚠️  {result.executed}件の注文を実行しました")
 
-    def run_continuous(self, max_cycles=None, interval_minutes=10):
-        """連続実行"""
+    def request_cycle(self):
+        """待機中の run_continuous を起こして次のサイクルを前倒しする。
+
+        FR の急変を検知した監視スレッドなどから呼ぶ（スレッドセーフ）。
+        """
+        self._wake.set()
+
+    def _seconds_until_funding_wake(self, offset_minutes):
+        """次の funding 時刻の offset_minutes 分前までの秒数"""
+        now = time.time()
+        offset = offset_minutes * 60
+        wake_at = (now // FUNDING_INTERVAL_SECONDS + 1) * FUNDING_INTERVAL_SECONDS - offset
+        if wake_at <= now:
+            wake_at += FUNDING_INTERVAL_SECONDS
+        return wake_at - now
+
+    def run_continuous(
+        self,
+        max_cycles=None,
+        interval_minutes=10,
+        align_to_funding=False,
+        wake_offset_minutes=FUNDING_WAKE_OFFSET_MINUTES,
+    ):
+        """連続実行
+
+        既定では interval_minutes 間隔で実行する。align_to_funding=True の場合は
+        固定間隔の代わりに funding 時刻の wake_offset_minutes 分前に合わせて起床する
+        （サイクルが1時間おきになるので min_persistence_windows の実時間も伸びる点に注意）。
+        request_cycle() が呼ばれた場合はその時点で起床する。
+        """
         print(f"\n連続実行モード:")
-        print(f"  サイクル間隔: {interval_minutes}分")
+        if align_to_funding:
+            print(f"  サイクル: funding時刻の{wake_offset_minutes}分前")
+        else:
+            print(f"  サイクル間隔: {interval_minutes}分")
         print(f"  最大サイクル数: {max_cycles if max_cycles else '無制限'}")
         print(f"  Ctrl+C で停止")
         print()
@@ -157,8 +192,14 @@ class ProductionTradingSimulator:
                     print(f"\n最大サイクル数 {max_cycles} に到達しました")
                     break
 
-                print(f"\n次のサイクルまで {interval_minutes} 分待機中...")
-                time.sleep(interval_minutes * 60)
+                if align_to_funding:
+                    wait_seconds = self._seconds_until_funding_wake(wake_offset_minutes)
+                else:
+                    wait_seconds = interval_minutes * 60
+                print(f"\n次のサイクルまで {wait_seconds / 60:.1f} 分待機中...")
+                if self._wake.wait(timeout=wait_seconds):
+                    print("\n[起床] サイクル要求を受けて前倒しで実行します")
+                self._wake.clear()
 
         except KeyboardInterrupt:
             print("\n\n[中断] ユーザーによって停止されました")
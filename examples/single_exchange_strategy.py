@@ -8,7 +8,11 @@
 Bitget単独で十分に運用可能。
 """
 
-from funding_arb import ExchangeConfig, FundingArbConfig, LorisAPIClient, LorisMarketDataService
+import heapq
+from operator import attrgetter
+
+from funding_arb import FundingArbConfig, LorisAPIClient, LorisMarketDataService
+from funding_arb.config import ExchangeConfig
 
 
 def create_single_exchange_config(exchange_name: str = "bitget") -> FundingArbConfig:
@@ -109,10 +113,19 @@ if __name__ == "__main__":
     loris_client = LorisAPIClient()
     response = loris_client.fetch()
 
-    bitget_rates = [fr for fr in response.funding_rates if fr.exchange == "bitget"]
-
-    positive_fr = [fr for fr in bitget_rates if fr.rate > 0][:5]
-    negative_fr = [fr for fr in bitget_rates if fr.rate < 0][:5]
+    # 取引所と符号による振り分けを1パスで行い、上位5件は全件ソートせずに取る
+    positive_rates = []
+    negative_rates = []
+    for fr in response.funding_rates:
+        if fr.exchange != "bitget":
+            continue
+        if fr.rate > 0:
+            positive_rates.append(fr)
+        elif fr.rate < 0:
+            negative_rates.append(fr)
+
+    positive_fr = heapq.nlargest(5, positive_rates, key=attrgetter("rate"))
+    negative_fr = heapq.nsmallest(5, negative_rates, key=attrgetter("rate"))
 
     print(f"\nプラスFR銘柄（上位5）:")
     for fr in positive_fr:
@@ -2,7 +2,7 @@
 
 from .config import FundingArbConfig
 from .execution import ExecutionService
-from .loris_client import LorisAPIClient
+from .loris_client import LorisAPIClient, LorisRateMapCache
 from .market_data import (
     HybridMarketDataService,
     LorisMarketDataService,
@@ -29,6 +29,7 @@ __all__ = [
     "HybridMarketDataService",
     "LorisAPIClient",
     "LorisMarketDataService",
+    "LorisRateMapCache",
     "MarketDataService",
     "PairCandidate",
     "PairFeaturesEstimator",
@@ -0,0 +1,163 @@
+"""Hyperliquid Info API 読み取り結果の短期キャッシュ。
+
+デバッグスクリプトから繰り返し呼ばれる ``user_state`` / ``user_fills`` を
+プロセス内メモリとユーザー専用ディレクトリ（0700）のJSONファイルにキャッシュし、
+同一スクリプト内・連続実行時のHTTPS往復を省く。
+
+注文系（market_open / market_close など）はキャッシュしない。
+ポジションのクローズ数量など、発注に使う値はキャッシュを通さず取得すること。
+書き込み後は ``invalidate_user_state`` で該当キーを破棄すること。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .cache import ensure_private_dir, user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = user_cache_dir("hl_cache")
+
+# 読み取り結果の有効秒数。ポジション確認用途なので短めにする。
+DEFAULT_TTL = 5.0
+
+
+class FileCache:
+    """タイムスタンプ付きJSONファイルによる簡易キャッシュ。
+
+    Parameters
+    ----------
+    cache_dir : str
+        キャッシュファイルの保存先ディレクトリ。
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+        self._cache_dir = cache_dir
+        self._memory: Dict[str, Tuple[float, Any]] = {}
+        self._dir_ok: Optional[bool] = None
+
+    def _use_files(self) -> bool:
+        # 自分専用（0700・自分所有）のディレクトリでなければメモリのみで動く
+        if self._dir_ok is None:
+            self._dir_ok = ensure_private_dir(self._cache_dir)
+        return self._dir_ok
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._cache_dir, f"{digest}.json")
+
+    def get(self, key: str, ttl: float) -> Optional[Any]:
+        """有効期限内の値を返す。無い・期限切れ・破損時は None。"""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None and now - entry[0] < ttl:
+            return entry[1]
+
+        if not self._use_files():
+            return None
+
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            timestamp = float(payload["timestamp"])
+            value = payload["value"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if now - timestamp >= ttl:
+            return None
+
+        self._memory[key] = (timestamp, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """値を保存する。ファイル書き込み失敗時はメモリのみ更新する。"""
+        timestamp = time.time()
+        self._memory[key] = (timestamp, value)
+
+        if not self._use_files():
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"timestamp": timestamp, "value": value}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as exc:
+            logger.debug("キャッシュ書き込み失敗 %s: %s", key, exc)
+
+    def invalidate(self, key: str) -> None:
+        """指定キーのキャッシュを破棄する。"""
+        self._memory.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+_default_cache: Optional[FileCache] = None
+
+
+def get_default_cache() -> FileCache:
+    """プロセス共通の FileCache を返す。"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FileCache()
+    return _default_cache
+
+
+def _cache_key(endpoint: str, address: str) -> str:
+    return f"{endpoint}:{address.lower()}"
+
+
+def _cached_info_call(
+    info: Any,
+    endpoint: str,
+    address: str,
+    ttl: float,
+    cache: Optional[FileCache],
+) -> Any:
+    cache = cache or get_default_cache()
+    key = _cache_key(endpoint, address)
+    hit = cache.get(key, ttl)
+    if hit is not None:
+        logger.debug("Infoキャッシュヒット: %s", endpoint)
+        return hit
+
+    value = getattr(info, endpoint)(address)
+    cache.set(key, value)
+    return value
+
+
+def cached_user_state(
+    info: Any,
+    address: str,
+    ttl: float = DEFAULT_TTL,
+    cache: Optional[FileCache] = None,
+) -> Any:
+    """``info.user_state(address)`` をキャッシュ経由で取得する。"""
+    return _cached_info_call(info, "user_state", address, ttl, cache)
+
+
+def cached_user_fills(
+    info: Any,
+    address: str,
+    ttl: float = DEFAULT_TTL,
+    cache: Optional[FileCache] = None,
+) -> Any:
+    """``info.user_fills(address)`` をキャッシュ経由で取得する。"""
+    return _cached_info_call(info, "user_fills", address, ttl, cache)
+
+
+def invalidate_user_state(address: str, cache: Optional[FileCache] = None) -> None:
+    """注文後などに user_state / user_fills のキャッシュを破棄する。"""
+    cache = cache or get_default_cache()
+    cache.invalidate(_cache_key("user_state", address))
+    cache.invalidate(_cache_key("user_fills", address))
@@ -0,0 +1,46 @@
+"""JSON エンコード/デコードの薄いラッパー。
+
+``orjson`` がインストールされていればそちらを使い、無ければ標準の
+``json`` にフォールバックする。
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 任意依存
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """JSON バイト列/文字列をデコードする。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_pretty(obj: Any) -> str:
+    """インデント2の整形済み JSON 文字列を返す。"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def dumps(obj: Any) -> str:
+    """区切りの空白を省いた1行の JSON 文字列を返す。"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """1行の JSON を UTF-8 バイト列で返す（HTTP ボディ用）。
+
+    標準 ``json`` と同じく、str 以外の dict キー（int など）は文字列に変換する。
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
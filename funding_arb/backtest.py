@@ -1,19 +1,20 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from . import _json
 from .orchestrator import FundingArbOrchestrator
 from .types import PairFeatures, PortfolioState
 
 
-@dataclass
+@dataclass(slots=True)
 class BacktestCycleInput:
     portfolio_state: PortfolioState
     market_features: Dict[Tuple[str, str], PairFeatures]
 
 
-@dataclass
+@dataclass(slots=True)
 class BacktestSummary:
     cycles: int
     total_candidates: int
@@ -22,11 +23,25 @@ class BacktestSummary:
     total_blocked: int
     execution_rate: float
     records: List[dict] = field(default_factory=list)
+    # records_path 指定時はレコードをメモリに溜めず、この JSON Lines に書き出す
+    records_path: Optional[str] = None
 
 
 class FundingBacktester:
-    def __init__(self, orchestrator: FundingArbOrchestrator):
+    def __init__(
+        self,
+        orchestrator: FundingArbOrchestrator,
+        records_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            orchestrator: 各サイクルを実行するオーケストレータ
+            records_path: 指定するとサイクルごとのレコードを JSON Lines として
+                このパスへ逐次書き出し、BacktestSummary.records には溜めない。
+                長いバックテストでメモリ使用量がサイクル数に比例しなくなる。
+        """
         self.orchestrator = orchestrator
+        self.records_path = records_path
 
     def run(self, inputs: List[BacktestCycleInput]) -> BacktestSummary:
         total_candidates = 0
@@ -34,18 +49,23 @@ class FundingBacktester:
         total_executed = 0
         total_blocked = 0
         records: List[dict] = []
+        sink = (
+            open(self.records_path, "w", encoding="utf-8")
+            if self.records_path is not None
+            else None
+        )
 
-        for cycle in inputs:
-            out = self.orchestrator.run_cycle(
-                portfolio_state=cycle.portfolio_state,
-                market_features=cycle.market_features,
-            )
-            total_candidates += out.candidates
-            total_intents += out.intents
-            total_executed += out.executed
-            total_blocked += out.blocked
-            records.append(
-                {
+        try:
+            for cycle in inputs:
+                out = self.orchestrator.run_cycle(
+                    portfolio_state=cycle.portfolio_state,
+                    market_features=cycle.market_features,
+                )
+                total_candidates += out.candidates
+                total_intents += out.intents
+                total_executed += out.executed
+                total_blocked += out.blocked
+                record = {
                     "timestamp": out.timestamp.isoformat(),
                     "candidates": out.candidates,
                     "intents": out.intents,
@@ -53,7 +73,13 @@ class FundingBacktester:
                     "blocked": out.blocked,
                     "rebalanced": out.rebalanced,
                 }
-            )
+                if sink is not None:
+                    sink.write(_json.dumps(record) + "\n")
+                else:
+                    records.append(record)
+        finally:
+            if sink is not None:
+                sink.close()
 
         rate = (total_executed / total_intents) if total_intents > 0 else 0.0
         return BacktestSummary(
@@ -64,4 +90,5 @@ class FundingBacktester:
             total_blocked=total_blocked,
             execution_rate=rate,
             records=records,
+            records_path=self.records_path,
         )
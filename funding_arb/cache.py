@@ -0,0 +1,153 @@
+"""プロセスをまたいで使えるディスクキャッシュ。
+
+JSON 化できる値（API の生レスポンスなど）をユーザー専用ディレクトリに
+保存し、デバッグスクリプトを連続実行した際の API 呼び出しを省く。
+pickle は使わない（キャッシュファイルの改ざんでコードを実行させないため）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Optional
+
+from . import _json
+
+logger = logging.getLogger(__name__)
+
+
+def user_cache_dir(name: str) -> str:
+    """ユーザー専用のキャッシュディレクトリのパスを返す。
+
+    ``$XDG_CACHE_HOME``（未設定なら ``~/.cache``）配下の ``funding_arb/<name>``。
+
+    Parameters
+    ----------
+    name : str
+        サブディレクトリ名。
+
+    Returns
+    -------
+    str
+        キャッシュディレクトリのパス。
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "funding_arb", name)
+
+
+def ensure_private_dir(path: str) -> bool:
+    """ディレクトリを 0700 で作成し、自分専用であることを確認する。
+
+    他ユーザーが所有している、またはグループ・他者に権限がありそれを
+    外せない場合は False を返す（呼び出し側はファイルキャッシュを使わない）。
+
+    Parameters
+    ----------
+    path : str
+        対象ディレクトリ。
+
+    Returns
+    -------
+    bool
+        安全に読み書きできる場合 True。
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.stat(path)
+        getuid = getattr(os, "getuid", None)
+        if getuid is None:  # pragma: no cover - Windows は所有者チェックなし
+            return True
+        if st.st_uid != getuid():
+            logger.warning("キャッシュディレクトリの所有者が異なるため使用しません: %s", path)
+            return False
+        if st.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    except OSError as exc:
+        logger.warning("キャッシュディレクトリを使用できません %s: %s", path, exc)
+        return False
+    return True
+
+
+DEFAULT_CACHE_DIR = user_cache_dir("loris")
+
+
+class DiskCache:
+    """タイムスタンプ付き JSON ファイルによるキャッシュ。
+
+    保存先はユーザー専用（0700）ディレクトリに限り、条件を満たさない
+    場合はキャッシュしない。
+
+    Parameters
+    ----------
+    cache_dir : str
+        キャッシュファイルの保存先ディレクトリ。
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+        self._cache_dir = cache_dir
+        self._dir_ok: Optional[bool] = None
+
+    def _use_files(self) -> bool:
+        if self._dir_ok is None:
+            self._dir_ok = ensure_private_dir(self._cache_dir)
+        return self._dir_ok
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._cache_dir, f"{digest}.json")
+
+    def get(self, key: str, ttl: Optional[float]) -> Optional[Any]:
+        """キャッシュ値を返す。
+
+        Parameters
+        ----------
+        key : str
+            キャッシュキー。
+        ttl : Optional[float]
+            有効秒数。None の場合は期限切れでも返す（障害時のフォールバック用）。
+
+        Returns
+        -------
+        Optional[Any]
+            キャッシュ値。無い・期限切れ・破損時は None。
+        """
+        if not self._use_files():
+            return None
+
+        try:
+            with open(self._path(key), "rb") as f:
+                payload = _json.loads(f.read())
+            stored_at = float(payload["stored_at"])
+            value = payload["value"]
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+
+        if ttl is not None and time.time() - stored_at >= ttl:
+            return None
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """値を保存する。value は JSON 化できること。書き込み失敗はログのみで無視する。"""
+        if not self._use_files():
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            data = _json.dumps_bytes({"stored_at": time.time(), "value": value})
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as exc:
+            logger.debug("ディスクキャッシュ書き込み失敗 %s: %s", key, exc)
+
+    def invalidate(self, key: str) -> None:
+        """指定キーのキャッシュを破棄する。"""
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
@@ -1,8 +1,9 @@
 from dataclasses import dataclass, field
-from typing import Dict, List
+from types import MappingProxyType
+from typing import List, Mapping, Tuple
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ExchangeConfig:
     name: str
     # True if exchange already uses canonical sign:
@@ -37,6 +38,19 @@ class FundingArbConfig:
     exchanges: List[ExchangeConfig] = field(default_factory=list)
     symbols: List[str] = field(default_factory=list)
 
+    def __post_init__(self) -> None:
+        # シグナル・スコア計算のループで毎回作らないよう一度だけ計算する。
+        # exchanges は初期化後に差し替えないこと（差し替えても以下は更新されない）
+        self._exchange_sign_map: Mapping[str, bool] = MappingProxyType(
+            {e.name: e.canonical_funding_sign for e in self.exchanges}
+        )
+        self._exchange_names: Tuple[str, ...] = tuple(e.name for e in self.exchanges)
+
+    @property
+    def exchange_sign_map(self) -> Mapping[str, bool]:
+        """取引所名 → 符号が正規形か。読み取り専用。"""
+        return self._exchange_sign_map
+
     @property
-    def exchange_sign_map(self) -> Dict[str, bool]:
-        return {e.name: e.canonical_funding_sign for e in self.exchanges}
+    def exchange_names(self) -> Tuple[str, ...]:
+        return self._exchange_names
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import Dict, List, Optional, Set
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
 
 from .types import (
     ExecutionResult,
@@ -13,8 +15,30 @@ from .types import (
     TradeLeg,
 )
 
+# emergency_flatten で同時に発注するレッグ数の上限
+_MAX_FLATTEN_WORKERS = 16
+
+
+class OrderNotSubmittedError(Exception):
+    """注文を取引所へ送信する前に失敗したことを示す。
+
+    place_orders_bulk がこれを送出した場合に限り、ExecutionService は
+    各レッグを個別に発注し直す（二重発注にならないことが確実なため）。
+    """
+
+
+class OrderStatusUnknownError(Exception):
+    """送信済みだが約定したかどうか分からないレッグを示す。
+
+    place_orders_bulk の結果にこれが入ったレッグは再発注しない。
+    """
+
 
 class ExchangeExecutionClient(ABC):
+    # True の場合、ExecutionService はペアの2レッグを place_orders_bulk で
+    # 1回にまとめて発注する
+    supports_bulk_orders: bool = False
+
     @abstractmethod
     def place_order(
         self,
@@ -28,22 +52,101 @@ class ExchangeExecutionClient(ABC):
     ) -> Dict:
         raise NotImplementedError
 
+    def place_orders_bulk(
+        self,
+        legs: List[TradeLeg],
+        client_order_ids: List[str],
+    ) -> List[Union[Dict, Exception]]:
+        """複数レッグを発注し、レッグごとの結果を同じ順序で返す。
+
+        失敗したレッグは例外オブジェクトとして返す（結果が不明なレッグは
+        OrderStatusUnknownError）。既定実装は place_order を
+        順に呼ぶだけなので、一括発注APIを持つ取引所はこれを上書きして
+        supports_bulk_orders を True にする。
+
+        呼び出し全体が失敗した場合、送信前であれば OrderNotSubmittedError を
+        送出すること。それ以外の例外は「約定したかもしれない」ものとして
+        扱われ、再発注されない。
+        """
+        results: List[Union[Dict, Exception]] = []
+        for leg, client_order_id in zip(legs, client_order_ids):
+            try:
+                results.append(
+                    self.place_order(
+                        exchange=leg.exchange,
+                        symbol=leg.symbol,
+                        side=leg.side.value,
+                        qty=leg.qty,
+                        order_type=leg.order_type.value,
+                        reduce_only=leg.reduce_only,
+                        client_order_id=client_order_id,
+                    )
+                )
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def fetch_order_fill(
+        self,
+        exchange: str,
+        symbol: str,
+        client_order_id: str,
+    ) -> Optional[Dict]:
+        """client_order_id の注文が約定していれば place_order と同じ形の結果を返す。
+
+        約定していないことが確実なら None を返す。照会できない取引所では
+        NotImplementedError を送出する（既定）。ExecutionService は一括発注の
+        結果が不明なレッグを確定させるためにこれを呼ぶ。
+        """
+        raise NotImplementedError
+
+
+# 一括発注で送信済みだが約定したか分からないレッグのエラー接頭辞
+_UNCONFIRMED = "BULK_UNCONFIRMED"
+
 
 class ExecutionService:
     def __init__(
         self,
         client: ExchangeExecutionClient,
         max_retries: int = 2,
+        parallel_legs: bool = False,
+        max_executed_history: Optional[int] = None,
     ):
+        """
+        Args:
+            client: 注文を出すクライアント
+            max_retries: 1レッグあたりの再試行回数
+            parallel_legs: True の場合、2レッグを別スレッドで同時に発注して
+                片側だけ約定している時間を縮める。client.place_order が
+                スレッドセーフであること（同一ウォレットでnonceが衝突しない
+                こと）が前提なので既定は無効。
+            max_executed_history: 重複判定に保持する実行済み pair_id の上限。
+                超えた分は古い順に忘れる（同じペアを再び実行できるようになる）。
+                None の場合は無制限に保持する。
+        """
         self.client = client
         self.max_retries = max_retries
-        self._executed_ids: Set[str] = set()
+        self.max_executed_history = max_executed_history
+        # 挿入順を保持し、上限超過時は最も古い pair_id から捨てる
+        self._executed_ids: OrderedDict[str, None] = OrderedDict()
         self._open_positions: Dict[str, OpenPairPosition] = {}
+        # 約定したか確定できなかったレッグ（pair_id → レッグ）。emergency_flatten の対象
+        self._unconfirmed_legs: Dict[str, List[TradeLeg]] = {}
+        self._leg_pool: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=2, thread_name_prefix="exec-leg")
+            if parallel_legs
+            else None
+        )
 
     @property
     def open_positions(self) -> Dict[str, OpenPairPosition]:
         return dict(self._open_positions)
 
+    @property
+    def unconfirmed_legs(self) -> Dict[str, List[TradeLeg]]:
+        return {pair_id: list(legs) for pair_id, legs in self._unconfirmed_legs.items()}
+
     def _place_leg(self, leg: TradeLeg, client_order_id: str) -> OrderResult:
         last_err: Optional[str] = None
         for attempt in range(self.max_retries + 1):
@@ -57,17 +160,25 @@ class ExecutionService:
                     reduce_only=leg.reduce_only,
                     client_order_id=f"{client_order_id}-{attempt}",
                 )
-                return OrderResult(
-                    success=True,
-                    order_id=str(raw.get("id")),
-                    exchange=leg.exchange,
-                    symbol=leg.symbol,
-                    side=leg.side,
-                    qty=leg.qty,
-                    avg_price=float(raw.get("average", 0.0) or 0.0),
-                )
+                return self._filled(leg, raw)
             except Exception as exc:  # pragma: no cover - exercised by tests with fake client
                 last_err = str(exc)
+        return self._failed(leg, last_err)
+
+    @staticmethod
+    def _filled(leg: TradeLeg, raw: Dict) -> OrderResult:
+        return OrderResult(
+            success=True,
+            order_id=str(raw.get("id")),
+            exchange=leg.exchange,
+            symbol=leg.symbol,
+            side=leg.side,
+            qty=leg.qty,
+            avg_price=float(raw.get("average", 0.0) or 0.0),
+        )
+
+    @staticmethod
+    def _failed(leg: TradeLeg, error: Optional[str]) -> OrderResult:
         return OrderResult(
             success=False,
             order_id=None,
@@ -75,9 +186,56 @@ class ExecutionService:
             symbol=leg.symbol,
             side=leg.side,
             qty=leg.qty,
-            error=last_err or "UNKNOWN_ERROR",
+            error=error or "UNKNOWN_ERROR",
         )
 
+    def _place_legs_bulk(self, intent: TradeIntent) -> List[OrderResult]:
+        """2レッグを1回の一括発注で出す。
+
+        取引所に拒否されたレッグ、または送信前に失敗した場合のみ個別に
+        再発注する。送信後に失敗した可能性がある場合（タイムアウト・
+        レスポンス解析失敗など）は、二重に建玉しないよう再発注せず
+        client.fetch_order_fill で約定を照会する。照会できなければ
+        BULK_UNCONFIRMED の失敗として返す。
+        """
+        legs = [intent.leg_a, intent.leg_b]
+        cids = [f"{intent.pair_id}-a-bulk", f"{intent.pair_id}-b-bulk"]
+        try:
+            raws: List[Union[Dict, Exception]] = self.client.place_orders_bulk(legs, cids)
+        except OrderNotSubmittedError as exc:
+            raws = [exc, exc]
+        except Exception as exc:
+            return [
+                self._confirm_leg(leg, cid, f"{_UNCONFIRMED}: {exc}")
+                for leg, cid in zip(legs, cids)
+            ]
+
+        if len(raws) != len(legs):
+            return [
+                self._confirm_leg(leg, cid, f"{_UNCONFIRMED}: {len(raws)} results")
+                for leg, cid in zip(legs, cids)
+            ]
+
+        results: List[OrderResult] = []
+        for leg, tag, cid, raw in zip(legs, ("a", "b"), cids, raws):
+            if isinstance(raw, OrderStatusUnknownError):
+                results.append(self._confirm_leg(leg, cid, f"{_UNCONFIRMED}: {raw}"))
+            elif isinstance(raw, Exception):
+                results.append(self._place_leg(leg, f"{intent.pair_id}-{tag}-retry"))
+            else:
+                results.append(self._filled(leg, raw))
+        return results
+
+    def _confirm_leg(self, leg: TradeLeg, client_order_id: str, error: str) -> OrderResult:
+        """送信済みかもしれないレッグの約定を照会する。分からなければ error の失敗を返す。"""
+        try:
+            raw = self.client.fetch_order_fill(leg.exchange, leg.symbol, client_order_id)
+        except Exception:
+            return self._failed(leg, error)
+        if raw is None:
+            return self._failed(leg, "BULK_NOT_FILLED")
+        return self._filled(leg, raw)
+
     @staticmethod
     def _opposite(leg: TradeLeg) -> TradeLeg:
         side = "buy" if leg.side.value == "sell" else "sell"
@@ -99,7 +257,23 @@ class ExecutionService:
                 error="DUPLICATE_INTENT",
             )
 
-        self._executed_ids.add(intent.pair_id)
+        self._remember_executed(intent.pair_id)
+        if self.client.supports_bulk_orders:
+            leg_a, leg_b = self._place_legs_bulk(intent)
+            result = self._settle_concurrent_pair(intent, leg_a, leg_b)
+            unconfirmed = [
+                leg
+                for leg, res in ((intent.leg_a, leg_a), (intent.leg_b, leg_b))
+                if not res.success and res.error.startswith(_UNCONFIRMED)
+            ]
+            if unconfirmed:
+                # 約定していれば建玉が残るので、emergency_flatten で決済できるよう記録する
+                self._unconfirmed_legs[intent.pair_id] = unconfirmed
+                result.recovery_action = result.recovery_action or "UNCONFIRMED_LEGS_RECORDED"
+            return result
+        if self._leg_pool is not None:
+            return self._execute_pair_parallel(intent)
+
         leg_a = self._place_leg(intent.leg_a, f"{intent.pair_id}-a")
         if not leg_a.success:
             return ExecutionResult(
@@ -122,11 +296,67 @@ class ExecutionService:
                 recovery_action=recovery,
             )
 
+        return self._record_open(intent, leg_a, leg_b)
+
+    def _remember_executed(self, pair_id: str) -> None:
+        self._executed_ids[pair_id] = None
+        limit = self.max_executed_history
+        if limit is not None:
+            while len(self._executed_ids) > limit:
+                self._executed_ids.popitem(last=False)
+
+    def _execute_pair_parallel(self, intent: TradeIntent) -> ExecutionResult:
+        """2レッグを別スレッドで同時に発注する。"""
+        fut_a = self._leg_pool.submit(self._place_leg, intent.leg_a, f"{intent.pair_id}-a")
+        fut_b = self._leg_pool.submit(self._place_leg, intent.leg_b, f"{intent.pair_id}-b")
+        return self._settle_concurrent_pair(intent, fut_a.result(), fut_b.result())
+
+    def _settle_concurrent_pair(
+        self,
+        intent: TradeIntent,
+        leg_a: OrderResult,
+        leg_b: OrderResult,
+    ) -> ExecutionResult:
+        """同時に出した2レッグの結果を確定する。片側だけ約定した場合はその側を決済する。"""
+        if leg_a.success and leg_b.success:
+            return self._record_open(intent, leg_a, leg_b)
+
+        if not leg_a.success and not leg_b.success:
+            return ExecutionResult(
+                success=False,
+                pair_id=intent.pair_id,
+                leg_results=[leg_a, leg_b],
+                error="LEG_A_FAILED",
+            )
+
+        # Fail-safe: force-close the filled leg to avoid directional exposure.
+        if leg_a.success:
+            close = self._place_leg(self._opposite(intent.leg_a), f"{intent.pair_id}-flatten-a")
+            error = "LEG_B_FAILED"
+            recovery = "LEG_A_FLATTENED" if close.success else "LEG_A_FLATTEN_FAILED"
+        else:
+            close = self._place_leg(self._opposite(intent.leg_b), f"{intent.pair_id}-flatten-b")
+            error = "LEG_A_FAILED"
+            recovery = "LEG_B_FLATTENED" if close.success else "LEG_B_FLATTEN_FAILED"
+        return ExecutionResult(
+            success=False,
+            pair_id=intent.pair_id,
+            leg_results=[leg_a, leg_b, close],
+            error=error,
+            recovery_action=recovery,
+        )
+
+    def _record_open(
+        self,
+        intent: TradeIntent,
+        leg_a: OrderResult,
+        leg_b: OrderResult,
+    ) -> ExecutionResult:
         self._open_positions[intent.pair_id] = OpenPairPosition(
             pair_id=intent.pair_id,
             leg_a=intent.leg_a,
             leg_b=intent.leg_b,
-            opened_at=datetime.utcnow(),
+            opened_at_ns=time.time_ns(),
         )
 
         return ExecutionResult(
@@ -144,14 +374,43 @@ class ExecutionService:
         closed: List[str] = []
 
         pair_ids = list(self._open_positions.keys())
+        legs: List[TradeLeg] = []
+        cids: List[str] = []
         for pair_id in pair_ids:
             pos = self._open_positions[pair_id]
-            leg_a = self._place_leg(self._opposite(pos.leg_a), f"{pair_id}-emergency-a")
-            leg_b = self._place_leg(self._opposite(pos.leg_b), f"{pair_id}-emergency-b")
-            if leg_a.success and leg_b.success:
+            legs += (self._opposite(pos.leg_a), self._opposite(pos.leg_b))
+            cids += (f"{pair_id}-emergency-a", f"{pair_id}-emergency-b")
+        # 約定が確定できなかったレッグも reduce-only で決済を試みる
+        unconfirmed_ids = list(self._unconfirmed_legs.keys())
+        for pair_id in unconfirmed_ids:
+            for i, leg in enumerate(self._unconfirmed_legs[pair_id]):
+                legs.append(self._opposite(leg))
+                cids.append(f"{pair_id}-emergency-u{i}")
+
+        if self._leg_pool is not None and legs:
+            # parallel_legs 有効時（place_order がスレッドセーフな前提）は全レッグを
+            # 同時に発注し、待ち時間をペア数ぶんの往復から数往復に縮める
+            workers = min(len(legs), _MAX_FLATTEN_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="exec-flatten") as pool:
+                results = list(pool.map(self._place_leg, legs, cids))
+        else:
+            results = list(map(self._place_leg, legs, cids))
+
+        for i, pair_id in enumerate(pair_ids):
+            if results[2 * i].success and results[2 * i + 1].success:
                 closed.append(pair_id)
                 del self._open_positions[pair_id]
             else:
                 failures[pair_id] = "EMERGENCY_FLATTEN_FAILED"
 
+        offset = 2 * len(pair_ids)
+        for pair_id in unconfirmed_ids:
+            n = len(self._unconfirmed_legs[pair_id])
+            if all(r.success for r in results[offset:offset + n]):
+                closed.append(pair_id)
+                del self._unconfirmed_legs[pair_id]
+            else:
+                failures[pair_id] = "UNCONFIRMED_FLATTEN_FAILED"
+            offset += n
+
         return FlattenResult(success=len(failures) == 0, closed_pairs=closed, failures=failures)
@@ -0,0 +1,57 @@
+"""プロセス共通のHTTPセッション管理。
+
+Loris API と Hyperliquid REST を同じ ``requests.Session`` で叩くことで、
+スクリプト内の連続リクエストでTCP/TLS接続を再利用する。
+
+Loris ホストには urllib3 のリトライを付けない（``LorisAPIClient`` が
+自前のバックオフで再試行するため、重ねると試行回数が掛け算になる）。
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+
+# LorisAPIClient._request_with_retry が再試行するホスト
+NO_RETRY_PREFIXES = ("https://api.loris.tools/",)
+
+_session: Optional[requests.Session] = None
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=Retry(total=3, backoff_factor=0.5),
+    )
+    session.mount("https://", adapter)
+    for prefix in NO_RETRY_PREFIXES:
+        session.mount(prefix, HTTPAdapter(max_retries=0))
+    return session
+
+
+def get_session() -> requests.Session:
+    """共有セッションを返す。初回呼び出し時に生成する。"""
+    global _session
+    if _session is None:
+        logger.debug("共有HTTPセッション生成")
+        _session = _build_session()
+    return _session
+
+
+def close_session() -> None:
+    """共有セッションを閉じる。次回の get_session() で再生成される。"""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
@@ -5,42 +5,97 @@
 
 import os
 import logging
-from typing import Dict
-from dotenv import load_dotenv
-
-# hyperliquid-python-sdkをインポート
-try:
-    from hyperliquid.info import Info
-    from hyperliquid.exchange import Exchange
-    from hyperliquid.utils import constants
-    from eth_account import Account
-except ImportError:
-    raise ImportError(
-        "hyperliquid-python-sdkが必要です: pip install hyperliquid-python-sdk"
-    )
-
-from .execution import ExchangeExecutionClient
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
+
+from . import _json
+from .execution import (
+    ExchangeExecutionClient,
+    OrderNotSubmittedError,
+    OrderStatusUnknownError,
+)
 from .market_data import CCXTAdapter
+from .types import TradeLeg
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
+# hyperliquid-python-sdk / eth_account / dotenv は重いので、モジュール読み込み時
+# ではなく実際に使うクラスの初期化時にインポートする
+_SDK_REQUIRED = "hyperliquid-python-sdkが必要です: pip install hyperliquid-python-sdk"
+
+# 一括発注の IOC 指値に乗せるスリッページ（SDK の market_open の既定値と同じ）
+BULK_SLIPPAGE = 0.05
+
+# szDecimals は新規上場時にしか変わらないため、meta() の結果を長めに保持する
+SZ_DECIMALS_TTL = 3600.0
+
+
+def _api_url(testnet: bool) -> str:
+    """SDK の定数から API のベースURLを返す。"""
+    try:
+        from hyperliquid.utils import constants
+    except ImportError as exc:
+        raise ImportError(_SDK_REQUIRED) from exc
+    return constants.TESTNET_API_URL if testnet else constants.MAINNET_API_URL
+
+
+@lru_cache(maxsize=1024)
+def _to_hl_coin(symbol: str) -> str:
+    """CCXT形式のシンボルをHyperliquidのコイン名に変換（"ETH/USDT:USDT" → "ETH"）"""
+    return symbol.split("/")[0] if "/" in symbol else symbol
+
+
+def slippage_limit_price(px: float, is_buy: bool, slippage: float, sz_decimals: int) -> float:
+    """参照価格 px から成行相当の IOC 指値を求める
+
+    丸めは SDK の market_open と同じ（有効数字5桁、小数は 6 - szDecimals 桁）。
+    """
+    px *= (1 + slippage) if is_buy else (1 - slippage)
+    return round(float(f"{px:.5g}"), 6 - sz_decimals)
+
+
+def _parse_fill(status, client_order_id: str) -> Optional[Dict]:
+    """注文レスポンスの status 1件から約定結果を作る（未約定・エラーなら None）"""
+    filled = status.get("filled") if isinstance(status, dict) else None
+    if not filled:
+        return None
+    return {
+        "id": client_order_id,
+        "average": float(filled["avgPx"]),
+        "filled": float(filled["totalSz"]),
+        "status": "ok",
+    }
+
 
 class HyperliquidExecutionClient(ExchangeExecutionClient):
     """Hyperliquid用のExecutionClient実装（遅延初期化）"""
 
+    supports_bulk_orders = True
+
     def __init__(
         self,
         private_key: str | None = None,
         main_address: str | None = None,
         testnet: bool = True,
+        price_source: "HyperliquidMarketDataAdapter | None" = None,
     ):
         """
         Args:
             private_key: Agent Walletの秘密鍵
             main_address: メインウォレットのアドレス
             testnet: テストネットを使用するか
+            price_source: 約定参照価格を引く HyperliquidMarketDataAdapter。
+                指定するとサイクル冒頭に取得済みの allMids キャッシュを使い、
+                注文ごとの all_mids() 呼び出しを省く
         """
+        try:
+            from dotenv import load_dotenv
+            from eth_account import Account
+        except ImportError as exc:
+            raise ImportError(_SDK_REQUIRED) from exc
+        load_dotenv()
+
         self.private_key = private_key or os.getenv("HL_PRIVATE_KEY")
         if not self.private_key:
             raise ValueError("HL_PRIVATE_KEY が必要です")
@@ -50,12 +105,16 @@ class HyperliquidExecutionClient(ExchangeExecutionClient):
             raise ValueError("HL_MAIN_ADDRESS が必要です")
 
         self.testnet = testnet
-        self.base_url = constants.TESTNET_API_URL if testnet else constants.MAINNET_API_URL
+        self.base_url = _api_url(testnet)
+        self.price_source = price_source
 
         # アカウントのみ初期化（Info/Exchangeは遅延）
         self.account = Account.from_key(self.private_key)
         self._info = None
         self._exchange = None
+        # ティッカー(大文字) → szDecimals。_get_sz_decimals で遅延構築する
+        self._sz_decimals: Dict[str, int] = {}
+        self._sz_decimals_at: Optional[float] = None
 
         mode = "TESTNET" if testnet else "MAINNET"
         logger.info(f"HyperliquidExecutionClient 初期化 [{mode}] (遅延ロード)")
@@ -64,6 +123,8 @@ class HyperliquidExecutionClient(ExchangeExecutionClient):
     def info(self):
         """Info の遅延初期化"""
         if self._info is None:
+            from hyperliquid.info import Info
+
             logger.info("Info初期化中...")
             self._info = Info(self.base_url, skip_ws=True)
         return self._info
@@ -72,6 +133,8 @@ class HyperliquidExecutionClient(ExchangeExecutionClient):
     def exchange(self):
         """Exchange の遅延初期化（timeout付き）"""
         if self._exchange is None:
+            from hyperliquid.exchange import Exchange
+
             logger.info("Exchange初期化中...")
             self._exchange = Exchange(
                 wallet=self.account,
@@ -83,22 +146,37 @@ class HyperliquidExecutionClient(ExchangeExecutionClient):
     def _get_market_price(self, symbol: str) -> float:
         """現在の市場価格を取得"""
         # シンボルを正規化（"ETH/USDT:USDT" → "ETH"）
-        ticker = symbol.split("/")[0] if "/" in symbol else symbol
+        ticker = _to_hl_coin(symbol)
+        if self.price_source is not None:
+            price = self.price_source.get_mark_price(ticker)
+            if price > 0:
+                return price
+        # キャッシュに無い銘柄のみ REST で取得
         all_mids = self.info.all_mids()
         return float(all_mids.get(ticker.upper(), 0))
 
     def _get_sz_decimals(self, ticker: str) -> int:
-        """ティッカーのサイズ小数点桁数を取得"""
-        meta = self.info.meta()
-        for asset in meta.get("universe", []):
-            if asset.get("name", "").upper() == ticker.upper():
-                return asset.get("szDecimals", 0)
-        return 0
+        """ティッカーのサイズ小数点桁数を取得（meta() をTTL付きで辞書化して参照）"""
+        ticker = ticker.upper()
+        now = time.monotonic()
+        expired = (
+            self._sz_decimals_at is None
+            or now - self._sz_decimals_at >= SZ_DECIMALS_TTL
+        )
+        # 未知のティッカーは新規上場の可能性があるので取り直す
+        if expired or ticker not in self._sz_decimals:
+            meta = self.info.meta()
+            self._sz_decimals = {
+                asset.get("name", "").upper(): asset.get("szDecimals", 0)
+                for asset in meta.get("universe", [])
+            }
+            self._sz_decimals_at = now
+        return self._sz_decimals.get(ticker, 0)
 
     def _calculate_size(self, symbol: str, qty: float) -> float:
         """数量を適切な小数点桁数に丸める"""
         import math
-        ticker = symbol.split("/")[0] if "/" in symbol else symbol
+        ticker = _to_hl_coin(symbol)
         sz_decimals = self._get_sz_decimals(ticker)
         factor = 10 ** sz_decimals
         return int(qty * factor) / factor
@@ -115,7 +193,7 @@ class HyperliquidExecutionClient(ExchangeExecutionClient):
     ) -> Dict:
         """注文を実行"""
         # シンボルを正規化
-        ticker = symbol.split("/")[0] if "/" in symbol else symbol
+        ticker = _to_hl_coin(symbol)
         ticker = ticker.upper()
 
         # 数量を丸める
@@ -141,40 +219,103 @@ class HyperliquidExecutionClient(ExchangeExecutionClient):
                     sz=size,
                 )
 
+            # 約定価格・数量はレスポンスの statuses から取る（再度の all_mids() は不要）
+            fill = None
             if result.get("status") == "ok":
-                # 平均価格を取得（簡易版：現在価格を使用）
-                avg_price = self._get_market_price(symbol)
-
-                return {
-                    "id": client_order_id,
-                    "average": avg_price,
-                    "filled": size,
-                    "status": "ok",
-                }
-            else:
+                fill = _parse_fill(result["response"]["data"]["statuses"][0], client_order_id)
+            if fill is None:
                 raise Exception(f"注文失敗: {result}")
+            return fill
 
         except Exception as e:
             logger.error(f"注文エラー: {e}")
+            # サイズ精度の不一致に備え、次回の注文で szDecimals を取り直す
+            self._sz_decimals_at = None
             raise
 
 
+    def _ioc_limit_price(self, ticker: str, is_buy: bool) -> float:
+        """成行相当の IOC 指値を参照価格 ± BULK_SLIPPAGE で求める"""
+        px = self._get_market_price(ticker)
+        if px <= 0:
+            raise OrderNotSubmittedError(f"{ticker} の参照価格が取得できません")
+        return slippage_limit_price(px, is_buy, BULK_SLIPPAGE, self._get_sz_decimals(ticker))
+
+    def place_orders_bulk(
+        self,
+        legs: List[TradeLeg],
+        client_order_ids: List[str],
+    ) -> List[Union[Dict, Exception]]:
+        """新規建ての成行レッグを bulk_orders で1回の署名・1回のPOSTにまとめて発注
+
+        決済（reduce_only）や成行以外を含む場合は1件ずつ place_order で出す。
+        注文の組み立て（送信前）に失敗した場合は OrderNotSubmittedError を送出する。
+        """
+        if any(leg.reduce_only or leg.order_type.value != "market" for leg in legs):
+            return super().place_orders_bulk(legs, client_order_ids)
+
+        try:
+            order_requests = []
+            for leg in legs:
+                ticker = _to_hl_coin(leg.symbol).upper()
+                is_buy = leg.side.value == "buy"
+                order_requests.append({
+                    "coin": ticker,
+                    "is_buy": is_buy,
+                    "sz": self._calculate_size(ticker, leg.qty),
+                    "limit_px": self._ioc_limit_price(ticker, is_buy),
+                    "order_type": {"limit": {"tif": "Ioc"}},
+                    "reduce_only": False,
+                })
+                logger.info(f"[Hyperliquid] 一括注文: {ticker} {leg.side.value} {order_requests[-1]['sz']}")
+        except OrderNotSubmittedError:
+            raise
+        except Exception as e:
+            raise OrderNotSubmittedError(f"一括注文の組み立てに失敗: {e}") from e
+
+        try:
+            result = self.exchange.bulk_orders(order_requests)
+            if result.get("status") != "ok":
+                raise Exception(f"注文失敗: {result}")
+            statuses = result["response"]["data"]["statuses"]
+        except Exception as e:
+            logger.error(f"一括注文エラー: {e}")
+            self._sz_decimals_at = None
+            raise
+
+        # statuses が足りない場合、対応するレッグは約定不明として失敗扱いにする
+        results: List[Union[Dict, Exception]] = []
+        for i, client_order_id in enumerate(client_order_ids):
+            if i >= len(statuses):
+                results.append(
+                    OrderStatusUnknownError(f"注文結果なし: {len(statuses)}/{len(legs)}件")
+                )
+                continue
+            fill = _parse_fill(statuses[i], client_order_id)
+            results.append(fill if fill is not None else Exception(f"注文失敗: {statuses[i]}"))
+        return results
+
+
 class HyperliquidMarketDataAdapter(CCXTAdapter):
     """Hyperliquid用のMarketDataAdapter実装（軽量版）"""
 
-    def __init__(self, testnet: bool = True):
+    def __init__(self, testnet: bool = True, session=None):
         """
         Args:
             testnet: テストネットを使用するか
+            session: 共有するrequests.Session（省略時は専用セッションを生成）
         """
         self.testnet = testnet
-        self.base_url = constants.TESTNET_API_URL if testnet else constants.MAINNET_API_URL
+        self.base_url = _api_url(testnet)
         self._price_cache = {}  # キャッシュ：銘柄 → 価格
 
         # 軽量HTTPクライアント（Info初期化を回避）
-        import requests
-        self.session = requests.Session()
-        self.session.headers.update({"Content-Type": "application/json"})
+        if session is not None:
+            self.session = session
+        else:
+            import requests
+            self.session = requests.Session()
+            self.session.headers.update({"Content-Type": "application/json"})
 
         logger.info(f"HyperliquidMarketDataAdapter 初期化 [{'TESTNET' if testnet else 'MAINNET'}] (軽量版)")
 
@@ -187,7 +328,7 @@ class HyperliquidMarketDataAdapter(CCXTAdapter):
                 timeout=timeout
             )
             response.raise_for_status()
-            return response.json()
+            return _json.loads(response.content)
         except Exception as e:
             logger.error(f"API呼び出し失敗 {endpoint}: {e}")
             raise
@@ -197,7 +338,13 @@ class HyperliquidMarketDataAdapter(CCXTAdapter):
         try:
             # all_mids APIを直接呼び出し（Info不要）
             result = self._api_post("/info", {"type": "allMids"})
-            self._price_cache = result if isinstance(result, dict) else {}
+            # mid は文字列で返るため、ここで一度だけ float 化しておく。
+            # 参照側は大文字で引くので、キーも保存時に大文字へ揃える（kPEPE など）
+            self._price_cache = (
+                {coin.upper(): float(px) for coin, px in result.items()}
+                if isinstance(result, dict)
+                else {}
+            )
             logger.info(f"価格キャッシュ更新: {len(self._price_cache)}銘柄")
         except Exception as e:
             logger.error(f"価格取得失敗: {e}")
@@ -205,12 +352,11 @@ class HyperliquidMarketDataAdapter(CCXTAdapter):
     def get_mark_price(self, symbol: str) -> float:
         """キャッシュから価格取得"""
         ticker = self._normalize_symbol(symbol)
-        return float(self._price_cache.get(ticker.upper(), 0))
+        return self._price_cache.get(ticker.upper(), 0.0)
 
     def _normalize_symbol(self, symbol: str) -> str:
         """CCXT形式のシンボルをHyperliquid形式に変換"""
-        # "ETH/USDT:USDT" → "ETH"
-        return symbol.split("/")[0] if "/" in symbol else symbol
+        return _to_hl_coin(symbol)
 
     def fetch_funding_rate(self, symbol: str) -> Dict:
         """Funding rateを取得（キャッシュ使用）"""
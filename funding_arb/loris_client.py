@@ -7,12 +7,18 @@ https://api.loris.tools/funding からファンディングレートを取得し
 from __future__ import annotations
 
 import logging
+import random
+import threading
 import time
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field, replace
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
+from . import _json
+from .cache import DiskCache
+
 logger = logging.getLogger(__name__)
 
 # 1時間周期（interval=1）の取引所。レートをさらに8で割って8h相当に正規化する。
@@ -27,18 +33,42 @@ RATE_DIVISOR = 10_000
 # 1時間周期取引所を8時間相当に正規化する除数。
 HOURLY_TO_8H_DIVISOR = 8
 
+# リトライ待機の上限秒数（指数バックオフが伸びすぎないようにする）
+RETRY_DELAY_CAP = 10.0
+
+# LorisFundingRate から (exchange, symbol) キーとレートを取り出すアクセサ。
+_EXCHANGE_SYMBOL = attrgetter("exchange", "symbol")
+_RATE = attrgetter("rate")
+
+
+def _default_session() -> requests.Session:
+    """Loris 専用のセッションを作る。
+
+    接続プールは1ホスト・最大4本で十分。リトライは _request_with_retry が
+    行うので urllib3 側では再試行しない。keep-alive と gzip は requests の
+    既定ヘッダで有効になっている。
+    """
+    session = requests.Session()
+    session.mount(
+        "https://",
+        requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=4, max_retries=0
+        ),
+    )
+    return session
+
 
 # ---------------------------------------------------------------------------
 # データクラス
 # ---------------------------------------------------------------------------
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LorisSymbol:
     """APIが返すシンボル情報。"""
     name: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LorisExchange:
     """APIが返す取引所情報。"""
     name: str
@@ -46,7 +76,7 @@ class LorisExchange:
     interval: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LorisFundingRate:
     """正規化済みファンディングレート。"""
     exchange: str
@@ -55,13 +85,19 @@ class LorisFundingRate:
     rate: float  # 正規化済み（8h相当）
 
 
-@dataclass
+@dataclass(slots=True)
 class LorisResponse:
     """Loris Funding API のパース済みレスポンス全体。"""
     symbols: List[LorisSymbol]
     exchanges: List[LorisExchange]
     funding_rates: List[LorisFundingRate]
     fetched_at: float = field(default_factory=time.time)
+    # (exchange, symbol) → レート。_parse で構築し、省略時は funding_rates から作る
+    rate_index: Optional[Dict[Tuple[str, str], LorisFundingRate]] = None
+
+    def __post_init__(self) -> None:
+        if self.rate_index is None:
+            self.rate_index = {(fr.exchange, fr.symbol): fr for fr in self.funding_rates}
 
 
 # ---------------------------------------------------------------------------
@@ -82,11 +118,16 @@ class LorisAPIClient:
     max_retries : int
         リクエスト失敗時の最大リトライ回数。
     retry_delay : float
-        リトライ間の待機秒数。
+        リトライ間の待機秒数の基準値。試行ごとに倍増し（上限 RETRY_DELAY_CAP）、
+        ±50% のジッタを加える。
     cache_ttl : float
         キャッシュの有効秒数。
     session : Optional[requests.Session]
         テスト用にセッションを差し替え可能。
+    disk_cache : Optional[DiskCache]
+        指定すると生の JSON レスポンスをディスクにも保存し、
+        プロセスをまたいで再利用する。API障害時は期限切れの
+        キャッシュを返す。
     """
 
     def __init__(
@@ -97,14 +138,20 @@ class LorisAPIClient:
         retry_delay: float = 1.0,
         cache_ttl: float = 60.0,
         session: Optional[requests.Session] = None,
+        disk_cache: Optional[DiskCache] = None,
     ) -> None:
         self._url = url
         self._timeout = timeout
         self._max_retries = max_retries
         self._retry_delay = retry_delay
         self._cache_ttl = cache_ttl
-        self._session = session or requests.Session()
+        self._session = session or _default_session()
         self._cache: Optional[LorisResponse] = None
+        # 直近レスポンスの ETag。再取得時に If-None-Match で送り、304 なら再パースしない
+        self._etag: Optional[str] = None
+        self._disk_cache = disk_cache
+        # ディスクキャッシュ用に直近の生レスポンスを保持する（304 時の再保存用）
+        self._raw: Optional[Dict[str, Any]] = None
 
     # ------------------------------------------------------------------
     # パブリックAPI
@@ -126,7 +173,7 @@ class LorisAPIClient:
         Raises
         ------
         LorisAPIError
-            全てのリトライが失敗した場合。
+            全てのリトライが失敗し、フォールバック用のディスクキャッシュも無い場合。
         """
         if not force and self._cache is not None:
             elapsed = time.time() - self._cache.fetched_at
@@ -134,9 +181,46 @@ class LorisAPIClient:
                 logger.debug("キャッシュヒット (%.1f秒前)", elapsed)
                 return self._cache
 
-        raw = self._request_with_retry()
-        response = self._parse(raw)
-        self._cache = response
+        # v4: 生 JSON を保存し、読み込み時にパースする
+        disk_key = f"fetch:v4:{self._url}"
+        if not force and self._disk_cache is not None:
+            cached = self._load_disk(disk_key, ttl=self._cache_ttl)
+            if cached is not None:
+                logger.debug("ディスクキャッシュヒット")
+                self._cache = cached
+                return cached
+
+        try:
+            raw = self._request_with_retry()
+        except LorisAPIError:
+            stale = (
+                self._load_disk(disk_key, ttl=None)
+                if self._disk_cache is not None
+                else None
+            )
+            if stale is None:
+                raise
+            logger.warning(
+                "Loris API 取得失敗のため期限切れキャッシュを使用 (%.0f秒前)",
+                time.time() - stale.fetched_at,
+            )
+            return stale
+
+        if raw is None:
+            # 304 Not Modified: 前回のパース結果をそのまま延命する
+            logger.debug("Loris API 未更新 (304)")
+            # 返却済みのオブジェクトは書き換えず、取得時刻だけ差し替えた複製を作る
+            response = replace(self._cache, fetched_at=time.time())
+            self._cache = response
+        else:
+            response = self._parse(raw)
+            self._cache = response
+            if self._disk_cache is not None:
+                self._raw = raw
+        if self._disk_cache is not None and self._raw is not None:
+            self._disk_cache.set(
+                disk_key, {"fetched_at": response.fetched_at, "raw": self._raw}
+            )
         return response
 
     def get_rate(
@@ -161,11 +245,7 @@ class LorisAPIClient:
         Optional[LorisFundingRate]
             見つかった場合はレート、なければ None。
         """
-        resp = self.fetch(force=force)
-        for fr in resp.funding_rates:
-            if fr.exchange == exchange and fr.symbol == symbol:
-                return fr
-        return None
+        return self.fetch(force=force).rate_index.get((exchange, symbol))
 
     def get_rates_by_symbols(
         self,
@@ -193,19 +273,53 @@ class LorisAPIClient:
     def invalidate_cache(self) -> None:
         """キャッシュを明示的にクリアする。"""
         self._cache = None
+        self._etag = None
+        self._raw = None
 
     # ------------------------------------------------------------------
     # 内部メソッド
     # ------------------------------------------------------------------
 
-    def _request_with_retry(self) -> Dict[str, Any]:
-        """リトライ付きHTTPリクエスト。"""
+    def _load_disk(self, key: str, ttl: Optional[float]) -> Optional[LorisResponse]:
+        """ディスクキャッシュの生レスポンスをパースして返す。無い・破損時は None。"""
+        entry = self._disk_cache.get(key, ttl=ttl)
+        if entry is None:
+            return None
+        try:
+            raw = entry["raw"]
+            fetched_at = float(entry["fetched_at"])
+            response = self._parse(raw)
+        except Exception as exc:
+            # 途中で切れた・旧形式のファイルはキャッシュミス扱いにして消す
+            logger.warning("ディスクキャッシュ破損のため破棄: %s", exc)
+            self._disk_cache.invalidate(key)
+            return None
+        response.fetched_at = fetched_at
+        self._raw = raw
+        return response
+
+    def _request_with_retry(self) -> Optional[Dict[str, Any]]:
+        """リトライ付きHTTPリクエスト。
+
+        メモリ上のキャッシュがあれば条件付きGETにし、未更新（304）なら None を返す。
+        """
+        headers = (
+            {"If-None-Match": self._etag}
+            if self._etag is not None and self._cache is not None
+            else None
+        )
         last_exc: Optional[Exception] = None
         for attempt in range(1, self._max_retries + 1):
             try:
-                resp = self._session.get(self._url, timeout=self._timeout)
+                resp = self._session.get(
+                    self._url, timeout=self._timeout, headers=headers
+                )
+                if headers is not None and resp.status_code == 304:
+                    return None
                 resp.raise_for_status()
-                return resp.json()
+                raw = _json.loads(resp.content)
+                self._etag = resp.headers.get("ETag")
+                return raw
             except (requests.RequestException, ValueError) as exc:
                 last_exc = exc
                 logger.warning(
@@ -215,7 +329,10 @@ class LorisAPIClient:
                     exc,
                 )
                 if attempt < self._max_retries:
-                    time.sleep(self._retry_delay)
+                    # retry_delay を基準に指数バックオフし、±50% のジッタで
+                    # 複数クライアントの再試行タイミングをばらす
+                    delay = min(self._retry_delay * 2 ** (attempt - 1), RETRY_DELAY_CAP)
+                    time.sleep(delay * random.uniform(0.5, 1.5))
 
         raise LorisAPIError(
             f"全{self._max_retries}回のリトライが失敗しました"
@@ -243,34 +360,94 @@ class LorisAPIClient:
         # ファンディングレート
         raw_rates = raw.get("funding_rates", {})
         funding_rates: List[LorisFundingRate] = []
+        rate_index: Dict[Tuple[str, str], LorisFundingRate] = {}
         for ex_name, symbol_rates in raw_rates.items():
             if not isinstance(symbol_rates, dict):
                 continue
-            is_hourly = ex_name in HOURLY_EXCHANGES
+            # 取引所ごとの除数を先に決め、レート1件あたりの除算を1回にする
+            divisor = (
+                RATE_DIVISOR * HOURLY_TO_8H_DIVISOR
+                if ex_name in HOURLY_EXCHANGES
+                else RATE_DIVISOR
+            )
             for sym, raw_value in symbol_rates.items():
                 try:
                     val = float(raw_value)
                 except (TypeError, ValueError):
                     continue
-                rate = val / RATE_DIVISOR
-                if is_hourly:
-                    rate = rate / HOURLY_TO_8H_DIVISOR
-                funding_rates.append(
-                    LorisFundingRate(
-                        exchange=ex_name,
-                        symbol=sym,
-                        raw_value=val,
-                        rate=rate,
-                    )
+                fr = LorisFundingRate(
+                    exchange=ex_name,
+                    symbol=sym,
+                    raw_value=val,
+                    rate=val / divisor,
                 )
+                funding_rates.append(fr)
+                rate_index[(ex_name, sym)] = fr
 
         return LorisResponse(
             symbols=symbols,
             exchanges=exchanges,
             funding_rates=funding_rates,
+            rate_index=rate_index,
         )
 
 
+class LorisRateMapCache:
+    """``(exchange, symbol) → rate`` の辞書をTTL付きでキャッシュする。
+
+    ファンディングレートの更新は1時間〜8時間ごとのため、10分サイクルの
+    PnL計算では毎回 fetch() して辞書を作り直す必要はない。スレッド間で
+    共有できるようロックで保護する。
+
+    Parameters
+    ----------
+    client : LorisAPIClient
+        レート取得に使うクライアント。
+    ttl : float
+        辞書の有効秒数。
+    """
+
+    def __init__(self, client: LorisAPIClient, ttl: float = 3600.0) -> None:
+        self._client = client
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._rate_map: Dict[Tuple[str, str], float] = {}
+        self._fetched_at: Optional[float] = None
+
+    def get(self, force: bool = False) -> Dict[Tuple[str, str], float]:
+        """レート辞書を返す。期限切れなら再取得して作り直す。
+
+        Parameters
+        ----------
+        force : bool
+            TTLを無視して再取得するか。
+
+        Returns
+        -------
+        Dict[Tuple[str, str], float]
+            ``(exchange, symbol)`` をキーとする正規化済みレート。
+        """
+        with self._lock:
+            now = time.time()
+            if (
+                force
+                or self._fetched_at is None
+                or now - self._fetched_at >= self._ttl
+            ):
+                rates = self._client.fetch(force=force).funding_rates
+                # キー・値の取り出しと辞書構築を C 実装の map/zip に任せる
+                self._rate_map = dict(
+                    zip(map(_EXCHANGE_SYMBOL, rates), map(_RATE, rates))
+                )
+                self._fetched_at = now
+            return self._rate_map
+
+    def invalidate(self) -> None:
+        """キャッシュを破棄する。"""
+        with self._lock:
+            self._fetched_at = None
+
+
 # ---------------------------------------------------------------------------
 # 例外
 # ---------------------------------------------------------------------------
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Iterable, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional
 
-from .loris_client import LorisAPIClient, LorisFundingRate
+from .loris_client import LorisAPIClient
 from .types import FundingSnapshot
 from .universe import DynamicUniverseProvider, SymbolScore
 
@@ -55,6 +57,15 @@ class MarketDataService(ABC):
 
 
 class CCXTAdapter(ABC):
+    """取引所アダプタ。
+
+    任意で以下を実装すると HybridMarketDataService が利用する:
+
+    - ``refresh_prices()``: サイクル冒頭に価格を一括取得する
+    - ``fetch_open_interests(symbols)`` / ``fetch_order_books(symbols, limit)``:
+      シンボル → 結果の辞書を1回の呼び出しで返す（CCXT の同名APIと同じ形）
+    """
+
     @abstractmethod
     def fetch_funding_rate(self, symbol: str) -> Dict:
         raise NotImplementedError
@@ -74,7 +85,7 @@ class CCXTMarketDataService(MarketDataService):
     def __init__(
         self,
         adapters: Dict[str, CCXTAdapter],
-        canonical_sign_map: Optional[Dict[str, bool]] = None,
+        canonical_sign_map: Optional[Mapping[str, bool]] = None,
     ):
         self.adapters = adapters
         self.canonical_sign_map = canonical_sign_map or {}
@@ -198,22 +209,113 @@ LORIS_SYMBOL_MAP: Dict[str, str] = {
     "WIF": "WIF/USDT:USDT",
 }
 
+# 内部表記 → Loris取引所名の逆引き（モジュール読み込み時に1回だけ構築）
+_INTERNAL_TO_LORIS: Dict[str, str] = {v: k for k, v in LORIS_EXCHANGE_MAP.items()}
+
 
 def _loris_to_internal_exchange(loris_name: str) -> str:
     """Loris取引所名を内部表記に変換する。"""
     return LORIS_EXCHANGE_MAP.get(loris_name, loris_name)
 
 
+# シンボル変換は純粋関数で、サイクルごとに同じ銘柄で繰り返し呼ばれるため
+# 結果をキャッシュする（LORIS_SYMBOL_MAP を実行時に書き換えた場合は
+# _loris_to_ccxt_symbol.cache_clear() を呼ぶこと）
+@lru_cache(maxsize=4096)
 def _loris_to_ccxt_symbol(loris_symbol: str) -> str:
     """LorisシンボルをCCXT形式に変換する。"""
     return LORIS_SYMBOL_MAP.get(loris_symbol, f"{loris_symbol}/USDT:USDT")
 
 
+@lru_cache(maxsize=4096)
 def _ccxt_to_loris_symbol(ccxt_symbol: str) -> str:
     """CCXTシンボルをLoris形式に変換する。"""
     # "BTC/USDT:USDT" → "BTC"
-    base = ccxt_symbol.split("/")[0]
-    return base
+    return ccxt_symbol.partition("/")[0]
+
+
+def _oi_value(oi: Dict) -> float:
+    return float(oi.get("openInterestValue", 0.0) or 0.0)
+
+
+def _book_top(ob: Dict) -> tuple:
+    """板から (最良bid, 最良ask) を取り出す。無い側は None。"""
+    bids = ob.get("bids")
+    asks = ob.get("asks")
+    return (
+        float(bids[0][0]) if bids else None,
+        float(asks[0][0]) if asks else None,
+    )
+
+
+def _fetch_open_interests(
+    adapter: CCXTAdapter,
+    exchange: str,
+    symbols: List[str],
+) -> Dict[str, float]:
+    """シンボル → OI（USD）。一括APIがあれば1回の呼び出しで取得する。
+
+    一括APIが失敗した場合（ccxt の ``NotSupported`` など）や結果に含まれない
+    シンボルは、銘柄ごとの ``fetch_open_interest`` で補う。
+    """
+    out: Dict[str, float] = {}
+    batch = getattr(adapter, "fetch_open_interests", None)
+    if batch is not None:
+        try:
+            raw = batch(symbols)
+        except Exception as exc:
+            logger.warning(
+                "CCXT OI一括取得失敗、銘柄ごとに取得します: %s (%s)", exchange, exc,
+            )
+        else:
+            out = {symbol: _oi_value(oi) for symbol, oi in raw.items()}
+
+    for symbol in symbols:
+        if symbol in out:
+            continue
+        try:
+            out[symbol] = _oi_value(adapter.fetch_open_interest(symbol))
+        except Exception:
+            logger.warning(
+                "CCXT OI取得失敗: %s %s", exchange, symbol,
+                exc_info=True,
+            )
+    return out
+
+
+def _fetch_book_tops(
+    adapter: CCXTAdapter,
+    exchange: str,
+    symbols: List[str],
+) -> Dict[str, tuple]:
+    """シンボル → (bid, ask)。一括APIがあれば1回の呼び出しで取得する。
+
+    一括APIが失敗した場合や結果に含まれないシンボルは、銘柄ごとの
+    ``fetch_order_book`` で補う。
+    """
+    out: Dict[str, tuple] = {}
+    batch = getattr(adapter, "fetch_order_books", None)
+    if batch is not None:
+        try:
+            raw = batch(symbols, limit=5)
+        except Exception as exc:
+            logger.warning(
+                "CCXT 板情報一括取得失敗、銘柄ごとに取得します: %s (%s)", exchange, exc,
+            )
+        else:
+            out = {symbol: _book_top(ob) for symbol, ob in raw.items()}
+
+    for symbol in symbols:
+        if symbol in out:
+            continue
+        try:
+            out[symbol] = _book_top(adapter.fetch_order_book(symbol, limit=5))
+        except Exception:
+            logger.warning(
+                "CCXT 板情報取得失敗: %s %s", exchange, symbol,
+                exc_info=True,
+            )
+    return out
 
 
 # ---------------------------------------------------------------------------
@@ -328,18 +430,16 @@ class LorisMarketDataService(MarketDataService):
         """
         exchange_set = set(exchanges)
         symbol_list = list(symbols)
-        # CCXTシンボルをLorisシンボルに変換
-        loris_symbols = [_ccxt_to_loris_symbol(s) for s in symbol_list]
+        # CCXTシンボルをLorisシンボルに変換し、Loris → CCXT の対応を1回だけ求める
+        # （シンボルフィルタも兼ねた辞書なので、レートごとの判定は O(1)）
+        loris_to_ccxt: Dict[str, str] = {}
+        for s in symbol_list:
+            loris_sym = _ccxt_to_loris_symbol(s)
+            loris_to_ccxt[loris_sym] = _loris_to_ccxt_symbol(loris_sym)
 
         response = self._loris.fetch()
         now = datetime.utcnow()
 
-        # 対象exchangeの逆引きマップ: 内部名 → Loris名
-        internal_to_loris: Dict[str, str] = {}
-        for loris_name, internal_name in LORIS_EXCHANGE_MAP.items():
-            if internal_name in exchange_set:
-                internal_to_loris[internal_name] = loris_name
-
         snapshots: List[FundingSnapshot] = []
         for fr in response.funding_rates:
             internal_exchange = _loris_to_internal_exchange(fr.exchange)
@@ -353,11 +453,10 @@ class LorisMarketDataService(MarketDataService):
                 continue
 
             # シンボルフィルタ
-            if fr.symbol not in loris_symbols:
+            ccxt_symbol = loris_to_ccxt.get(fr.symbol)
+            if ccxt_symbol is None:
                 continue
 
-            ccxt_symbol = _loris_to_ccxt_symbol(fr.symbol)
-
             snapshots.append(
                 FundingSnapshot(
                     exchange=internal_exchange,
@@ -409,20 +508,25 @@ class HybridMarketDataService(MarketDataService):
         Loris API クライアント。
     ccxt_adapters : Dict[str, CCXTAdapter]
         CCXT アダプタのマップ（取引所名 → アダプタ）。
-    canonical_sign_map : Optional[Dict[str, bool]]
+    canonical_sign_map : Optional[Mapping[str, bool]]
         取引所ごとの funding rate 符号正規化フラグ。
         Loris は既に正規化済みのためデフォルト True。
+        省略時は config.exchange_sign_map を使う。
+    config : Optional[FundingArbConfig]
+        指定するとユニバース選定に使う。
     """
 
     def __init__(
         self,
         loris_client: LorisAPIClient,
         ccxt_adapters: Dict[str, CCXTAdapter],
-        canonical_sign_map: Optional[Dict[str, bool]] = None,
+        canonical_sign_map: Optional[Mapping[str, bool]] = None,
         config: Optional["FundingArbConfig"] = None,
     ) -> None:
         self._loris = loris_client
         self._ccxt_adapters = ccxt_adapters
+        if canonical_sign_map is None and config is not None:
+            canonical_sign_map = config.exchange_sign_map
         self._canonical_sign_map = canonical_sign_map or {}
         self._universe_provider: Optional[DynamicUniverseProvider] = None
         if config is not None:
@@ -500,70 +604,67 @@ class HybridMarketDataService(MarketDataService):
         symbol_list = list(symbols)
         loris_symbols = [_ccxt_to_loris_symbol(s) for s in symbol_list]
 
-        # Loris から funding rate を一括取得
-        response = self._loris.fetch()
+        # Hyperliquid adapter があれば価格を一括取得する。Loris の取得とは
+        # 独立した I/O なので、別スレッドで並行して待ち時間を重ねる
+        price_adapters = [
+            adapter
+            for adapter in (self._ccxt_adapters.get(ex) for ex in exchange_set)
+            if adapter is not None and hasattr(adapter, "refresh_prices")
+        ]
+        if price_adapters:
+            with ThreadPoolExecutor(max_workers=len(price_adapters)) as pool:
+                refreshes = [pool.submit(a.refresh_prices) for a in price_adapters]
+                response = self._loris.fetch()
+                for fut in refreshes:
+                    fut.result()
+        else:
+            response = self._loris.fetch()
         now = datetime.utcnow()
 
-        # Loris のレートを (exchange, symbol) でインデックス化
-        rate_index: Dict[tuple, LorisFundingRate] = {}
-        for fr in response.funding_rates:
-            internal_ex = _loris_to_internal_exchange(fr.exchange)
-            if internal_ex in exchange_set and fr.symbol in loris_symbols:
-                ccxt_sym = _loris_to_ccxt_symbol(fr.symbol)
-                rate_index[(internal_ex, ccxt_sym)] = fr
+        # Loris 側のシンボルに往復変換できる銘柄だけを対象にする
+        symbol_pairs = [
+            (symbol, loris_sym)
+            for symbol, loris_sym in zip(symbol_list, loris_symbols)
+            if _loris_to_ccxt_symbol(loris_sym) == symbol
+        ]
+        rate_index = response.rate_index
 
-        # Hyperliquid adapterがあれば価格を一括取得
+        # 取引所ごとに Loris にレートがある銘柄を集める
+        work = []
         for exchange in exchange_set:
-            adapter = self._ccxt_adapters.get(exchange)
-            if adapter and hasattr(adapter, 'refresh_prices'):
-                adapter.refresh_prices()
+            loris_ex = _INTERNAL_TO_LORIS.get(exchange, exchange)
+            rated = [
+                (symbol, loris_rate)
+                for symbol, loris_sym in symbol_pairs
+                if (loris_rate := rate_index.get((loris_ex, loris_sym))) is not None
+            ]
+            if rated:
+                work.append((exchange, rated))
+
+        # CCXT から OI と板情報を補完する。取引所ごとに別アダプタ・別ホストなので
+        # 複数あればスレッドで並行させ、待ち時間を取引所数の和から最大値に縮める
+        # （同じアダプタへの呼び出しは1スレッド内で順に行う）
+        work_exchanges = [exchange for exchange, _ in work]
+        work_symbols = [[symbol for symbol, _ in rated] for _, rated in work]
+        if len(work) > 1:
+            with ThreadPoolExecutor(max_workers=len(work)) as pool:
+                market = list(pool.map(self._fetch_market, work_exchanges, work_symbols))
+        else:
+            market = list(map(self._fetch_market, work_exchanges, work_symbols))
 
         snapshots: List[FundingSnapshot] = []
-        for exchange in exchange_set:
-            adapter = self._ccxt_adapters.get(exchange)
-            for symbol in symbol_list:
-                loris_rate = rate_index.get((exchange, symbol))
-                if loris_rate is None:
-                    continue
-
-                funding_rate = loris_rate.rate
-
-                # CCXT から OI と板情報を補完
-                oi_value = 0.0
-                mark_price = 0.0
-                bid: Optional[float] = None
-                ask: Optional[float] = None
-
-                if adapter is not None:
-                    try:
-                        oi = adapter.fetch_open_interest(symbol)
-                        oi_value = float(oi.get("openInterestValue", 0.0) or 0.0)
-                    except Exception:
-                        logger.warning(
-                            "CCXT OI取得失敗: %s %s", exchange, symbol,
-                            exc_info=True,
-                        )
-
-                    try:
-                        ob = adapter.fetch_order_book(symbol, limit=5)
-                        bids = ob.get("bids", [])
-                        asks = ob.get("asks", [])
-                        bid = float(bids[0][0]) if bids else None
-                        ask = float(asks[0][0]) if asks else None
-                        if bid and ask:
-                            mark_price = (bid + ask) / 2
-                    except Exception:
-                        logger.warning(
-                            "CCXT 板情報取得失敗: %s %s", exchange, symbol,
-                            exc_info=True,
-                        )
+        for (exchange, rated), (oi_by_symbol, book_by_symbol) in zip(work, market):
+            for symbol, loris_rate in rated:
+                oi_value = oi_by_symbol.get(symbol, 0.0)
+                bid, ask = book_by_symbol.get(symbol, (None, None))
+                mark_price = (bid + ask) / 2 if bid and ask else 0.0
 
                 snapshots.append(
                     FundingSnapshot(
                         exchange=exchange,
                         symbol=symbol,
                         timestamp=now,
-                        funding_rate=funding_rate,
+                        funding_rate=loris_rate.rate,
                         next_funding_time=None,
                         oi=oi_value,
                         mark_price=mark_price,
@@ -578,6 +679,16 @@ class HybridMarketDataService(MarketDataService):
         )
         return snapshots
 
+    def _fetch_market(self, exchange: str, symbols: List[str]) -> tuple:
+        """取引所1つ分の (シンボル → OI, シンボル → (bid, ask)) を取得する。"""
+        adapter = self._ccxt_adapters.get(exchange)
+        if adapter is None:
+            return {}, {}
+        return (
+            _fetch_open_interests(adapter, exchange, symbols),
+            _fetch_book_tops(adapter, exchange, symbols),
+        )
+
     def get_orderbook_tops(
         self,
         exchange: str,
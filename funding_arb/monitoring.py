@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Optional
-from urllib import request
+import requests
+from requests.adapters import HTTPAdapter
 
+from . import _json
 
-@dataclass
+
+@dataclass(slots=True)
 class AlertEvent:
     level: str
     title: str
@@ -16,11 +18,38 @@ class AlertEvent:
 
 
 class WebhookNotifier:
-    def __init__(self, webhook_url: Optional[str] = None, timeout_sec: int = 5):
+    """Webhook にアラートを POST する。
+
+    連続したアラートで TCP/TLS 接続を張り直さないよう、keep-alive の
+    ``requests.Session`` を使い回す。テスト用にセッションを差し替え可能。
+    """
+
+    def __init__(
+        self,
+        webhook_url: Optional[str] = None,
+        timeout_sec: int = 5,
+        session: Optional[requests.Session] = None,
+    ):
         self.webhook_url = webhook_url
         self.timeout_sec = timeout_sec
+        self._session = session
+
+    def _get_session(self) -> requests.Session:
+        # 通知が無効なら接続プールも作らない
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.mount(
+                "https://", HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            )
+        return self._session
 
     def send(self, event: AlertEvent) -> bool:
+        """アラートを送信する。
+
+        webhook_url が未設定なら送信せず False を返す。4xx/5xx 応答は
+        ``requests.HTTPError``、接続失敗・タイムアウトは ``requests.RequestException``
+        を送出する（urllib 実装時の ``HTTPError`` / ``URLError`` から変更）。
+        """
         if not self.webhook_url:
             return False
 
@@ -31,12 +60,13 @@ class WebhookNotifier:
             "message": event.message,
             "context": event.context,
         }
-        payload = json.dumps(body).encode("utf-8")
-        req = request.Request(
+        # orjson があれば str を経由せず直接バイト列にする
+        payload = _json.dumps_bytes(body)
+        resp = self._get_session().post(
             self.webhook_url,
             data=payload,
             headers={"Content-Type": "application/json"},
-            method="POST",
+            timeout=self.timeout_sec,
         )
-        with request.urlopen(req, timeout=self.timeout_sec) as resp:
-            return 200 <= resp.status < 300
+        resp.raise_for_status()
+        return 200 <= resp.status_code < 300
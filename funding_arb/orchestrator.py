@@ -13,7 +13,7 @@ from .signals import SignalService, SizingContext
 from .types import FundingSnapshot, PairFeatures, PortfolioState
 
 
-@dataclass
+@dataclass(slots=True)
 class CycleResult:
     timestamp: datetime
     candidates: int
@@ -87,7 +87,7 @@ class FundingArbOrchestrator:
             )
 
         snapshots = self.market_data.get_funding_snapshots(
-            exchanges=[e.name for e in self.config.exchanges],
+            exchanges=self.config.exchange_names,
             symbols=symbols,
         )
         snap_idx = self._index_snapshots(snapshots)
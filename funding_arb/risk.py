@@ -6,7 +6,7 @@ from .config import FundingArbConfig
 from .types import PortfolioState, RiskState, RiskStatus, TradeIntent
 
 
-@dataclass
+@dataclass(slots=True)
 class RiskCheckResult:
     allowed: bool
     reason: str = ""
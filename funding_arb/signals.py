@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from bisect import bisect_right
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
@@ -16,7 +17,17 @@ from .types import (
 )
 
 
-@dataclass
+# 価格履歴が無いペアに使う中立的な特徴量（読み取り専用として共有する）
+_DEFAULT_PAIR_FEATURES = PairFeatures(
+    correlation=0.5,
+    beta=1.0,
+    beta_stability=0.5,
+    atr_ratio_stability=0.5,
+    mean_reversion_score=0.5,
+)
+
+
+@dataclass(slots=True)
 class SizingContext:
     capital_usd: float
 
@@ -68,37 +79,30 @@ class SignalService:
         market_features: Dict[Tuple[str, str], PairFeatures],
     ) -> List[PairCandidate]:
         candidates: List[PairCandidate] = []
-        n = len(snapshots)
-        for i in range(n):
-            for j in range(i + 1, n):
-                a = snapshots[i]
+        # FRの符号ごとにインデックスを分けておき、反対符号の組だけを走査する。
+        # (i, j) は i < j の昇順で列挙されるので、候補の並びは総当たりと変わらない。
+        positive_idx = [i for i, snap in enumerate(snapshots) if snap.funding_rate > 0]
+        negative_idx = [i for i, snap in enumerate(snapshots) if snap.funding_rate < 0]
+        min_liquidity = self.config.min_liquidity_score
+        for i, a in enumerate(snapshots):
+            if a.funding_rate == 0:
+                continue
+            opposite = negative_idx if a.funding_rate > 0 else positive_idx
+            for j in opposite[bisect_right(opposite, i):]:
                 b = snapshots[j]
                 if a.symbol == b.symbol and a.exchange == b.exchange:
                     continue
-                if a.funding_rate == 0 or b.funding_rate == 0:
-                    continue
-                if a.funding_rate * b.funding_rate >= 0:
-                    continue
 
                 key = self._key(a, b)
                 self._persistence_windows[key] = self._persistence_windows.get(key, 0) + 1
                 persistence = self._persistence_windows[key]
 
                 liq = self._liquidity_score(a, b)
-                if liq < self.config.min_liquidity_score:
+                if liq < min_liquidity:
                     continue
 
                 feature_key = self._feature_key(a, b)
-                feats = market_features.get(
-                    feature_key,
-                    PairFeatures(
-                        correlation=0.5,
-                        beta=1.0,
-                        beta_stability=0.5,
-                        atr_ratio_stability=0.5,
-                        mean_reversion_score=0.5,
-                    ),
-                )
+                feats = market_features.get(feature_key, _DEFAULT_PAIR_FEATURES)
                 pair_score = self._pair_score(feats, liq)
                 fr_diff = abs(a.funding_rate - b.funding_rate)
 
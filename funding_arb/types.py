@@ -1,5 +1,6 @@
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Dict, List, Optional
 
@@ -20,7 +21,7 @@ class OrderType(str, Enum):
     LIMIT = "limit"
 
 
-@dataclass
+@dataclass(slots=True)
 class FundingSnapshot:
     exchange: str
     symbol: str
@@ -33,7 +34,7 @@ class FundingSnapshot:
     ask: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PairFeatures:
     correlation: float
     beta: float
@@ -42,7 +43,7 @@ class PairFeatures:
     mean_reversion_score: float
 
 
-@dataclass
+@dataclass(slots=True)
 class PairCandidate:
     pair_id: str
     symbol_a: str
@@ -58,7 +59,7 @@ class PairCandidate:
     reason_codes: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class TradeLeg:
     exchange: str
     symbol: str
@@ -68,7 +69,7 @@ class TradeLeg:
     reduce_only: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class TradeIntent:
     pair_id: str
     leg_a: TradeLeg
@@ -77,7 +78,7 @@ class TradeIntent:
     reason_codes: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderResult:
     success: bool
     order_id: Optional[str]
@@ -89,7 +90,7 @@ class OrderResult:
     error: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionResult:
     success: bool
     pair_id: str
@@ -98,22 +99,38 @@ class ExecutionResult:
     recovery_action: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class FlattenResult:
     success: bool
     closed_pairs: List[str]
     failures: Dict[str, str]
 
 
-@dataclass
+@dataclass(slots=True)
 class OpenPairPosition:
     pair_id: str
     leg_a: TradeLeg
     leg_b: TradeLeg
-    opened_at: datetime
-
-
-@dataclass
+    # 建玉時刻（naive UTC）。opened_at_ns のみ渡された場合はそこから補完する
+    opened_at: Optional[datetime] = None
+    # エポックからのナノ秒（UTC）。経過時間の比較用に整数でも持つ
+    opened_at_ns: int = 0
+
+    def __post_init__(self) -> None:
+        if self.opened_at is None:
+            if not self.opened_at_ns:
+                self.opened_at_ns = time.time_ns()
+            self.opened_at = datetime.fromtimestamp(
+                self.opened_at_ns / 1e9, tz=timezone.utc
+            ).replace(tzinfo=None)
+        elif not self.opened_at_ns:
+            opened_at = self.opened_at
+            if opened_at.tzinfo is None:
+                opened_at = opened_at.replace(tzinfo=timezone.utc)
+            self.opened_at_ns = int(opened_at.timestamp() * 1e9)
+
+
+@dataclass(slots=True)
 class PortfolioState:
     equity: float
     peak_equity: float
@@ -122,7 +139,7 @@ class PortfolioState:
     exchange_notionals: Dict[str, float] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class RiskState:
     equity: float
     dd_pct: float
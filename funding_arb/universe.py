@@ -17,7 +17,7 @@ from .loris_client import LorisAPIClient, LorisFundingRate, LorisResponse
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class SymbolScore:
     """銘柄ごとのスコアリング結果。"""
     symbol: str
@@ -26,7 +26,7 @@ class SymbolScore:
     avg_abs_rate: float   # 平均絶対funding rate
 
 
-@dataclass
+@dataclass(slots=True)
 class UniverseSnapshot:
     """動的ユニバースの選定結果。"""
     symbols: List[str]
@@ -1,7 +1,6 @@
 """本番環境初期化テスト"""
 
 import sys
-sys.path.insert(0, "/Users/kenjihachiya/Desktop/work/development/hyperliquid-bot/src")
 
 print("=" * 70)
 print("本番環境初期化テスト開始")
@@ -0,0 +1,28 @@
+import pytest
+
+from funding_arb.config import ExchangeConfig, FundingArbConfig
+
+
+def _config() -> FundingArbConfig:
+    return FundingArbConfig(exchanges=[ExchangeConfig("binance"), ExchangeConfig("x", canonical_funding_sign=False)])
+
+
+def test_config_exchange_sign_map():
+    assert _config().exchange_sign_map == {"binance": True, "x": False}
+
+
+def test_config_exchange_names_is_cached():
+    cfg = _config()
+    names = cfg.exchange_names
+    assert names == ("binance", "x")
+    assert cfg.exchange_names is names
+
+
+def test_config_exchange_sign_map_is_computed_once():
+    cfg = _config()
+    assert cfg.exchange_sign_map is cfg.exchange_sign_map
+
+
+def test_config_exchange_sign_map_is_read_only():
+    with pytest.raises(TypeError):
+        _config().exchange_sign_map["binance"] = False
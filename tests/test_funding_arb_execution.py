@@ -1,7 +1,13 @@
+from datetime import datetime, timedelta
 from typing import Dict
 
-from funding_arb.execution import ExecutionService, ExchangeExecutionClient
-from funding_arb.types import OrderSide, TradeIntent, TradeLeg
+from funding_arb.execution import (
+    ExchangeExecutionClient,
+    ExecutionService,
+    OrderNotSubmittedError,
+    OrderStatusUnknownError,
+)
+from funding_arb.types import OpenPairPosition, OrderSide, TradeIntent, TradeLeg
 
 
 class FakeClient(ExchangeExecutionClient):
@@ -50,6 +56,17 @@ def test_duplicate_intent_blocked():
     assert second.error == "DUPLICATE_INTENT"
 
 
+def test_executed_history_limit_forgets_oldest():
+    client = FakeClient()
+    svc = ExecutionService(client, max_executed_history=2)
+
+    for pair_id in ("p1", "p2", "p3"):
+        assert svc.execute_pair(_intent(pair_id)).success
+
+    assert svc.execute_pair(_intent("p3")).error == "DUPLICATE_INTENT"
+    assert svc.execute_pair(_intent("p1")).success
+
+
 def test_leg_b_failure_triggers_flatten_a():
     client = FakeClient()
     client.fail_on["bybit:FOLKS/USDT:USDT:sell:N"] = 3
@@ -60,3 +77,195 @@ def test_leg_b_failure_triggers_flatten_a():
     assert not result.success
     assert result.error == "LEG_B_FAILED"
     assert result.recovery_action in {"LEG_A_FLATTENED", "LEG_A_FLATTEN_FAILED"}
+
+
+def test_parallel_legs_places_both_legs():
+    client = FakeClient()
+    svc = ExecutionService(client, parallel_legs=True)
+
+    result = svc.execute_pair(_intent("pair-par"))
+
+    assert result.success
+    assert {c[5] for c in client.calls} == {"pair-par-a-0", "pair-par-b-0"}
+    assert "pair-par" in svc.open_positions
+
+
+def test_parallel_legs_leg_a_failure_flattens_b():
+    client = FakeClient()
+    client.fail_on["binance:INIT/USDT:USDT:buy:N"] = 3
+    svc = ExecutionService(client, max_retries=1, parallel_legs=True)
+
+    result = svc.execute_pair(_intent("pair-par-fail"))
+
+    assert not result.success
+    assert result.error == "LEG_A_FAILED"
+    assert result.recovery_action == "LEG_B_FLATTENED"
+    assert ("bybit", "FOLKS/USDT:USDT", "buy", 1.0, True, "pair-par-fail-flatten-b-0") in client.calls
+    assert svc.open_positions == {}
+
+
+def test_open_position_records_opened_at():
+    before = datetime.utcnow()
+    svc = ExecutionService(FakeClient())
+    svc.execute_pair(_intent("pair-time"))
+
+    opened_at = svc.open_positions["pair-time"].opened_at
+    assert before - timedelta(seconds=1) <= opened_at <= datetime.utcnow() + timedelta(seconds=1)
+    assert opened_at.tzinfo is None
+
+
+def test_open_pair_position_accepts_opened_at_datetime():
+    intent = _intent("pair-ctor")
+    opened_at = datetime(2024, 1, 1, 8, 0, 0)
+    pos = OpenPairPosition(
+        pair_id="pair-ctor", leg_a=intent.leg_a, leg_b=intent.leg_b, opened_at=opened_at
+    )
+
+    assert pos.opened_at == opened_at
+    assert pos.opened_at_ns == 1_704_096_000 * 10**9
+
+
+class FailEmergencyClient(FakeClient):
+    def place_order(self, exchange, symbol, side, qty, order_type, reduce_only, client_order_id):
+        if client_order_id.startswith("e2-emergency-b"):
+            raise RuntimeError("flatten failure")
+        return super().place_order(exchange, symbol, side, qty, order_type, reduce_only, client_order_id)
+
+
+def test_parallel_emergency_flatten_reports_per_pair():
+    svc = ExecutionService(FailEmergencyClient(), parallel_legs=True)
+    for pair_id in ("e1", "e2", "e3"):
+        assert svc.execute_pair(_intent(pair_id)).success
+
+    result = svc.emergency_flatten()
+
+    assert not result.success
+    assert result.closed_pairs == ["e1", "e3"]
+    assert result.failures == {"e2": "EMERGENCY_FLATTEN_FAILED"}
+    assert list(svc.open_positions) == ["e2"]
+
+
+class BulkClient(FakeClient):
+    supports_bulk_orders = True
+
+    def __init__(self):
+        super().__init__()
+        self.bulk_calls = []
+
+    def place_orders_bulk(self, legs, client_order_ids):
+        self.bulk_calls.append(list(client_order_ids))
+        return super().place_orders_bulk(legs, client_order_ids)
+
+
+def test_bulk_client_places_both_legs_in_one_call():
+    client = BulkClient()
+    svc = ExecutionService(client)
+
+    result = svc.execute_pair(_intent("pair-bulk"))
+
+    assert result.success
+    assert client.bulk_calls == [["pair-bulk-a-bulk", "pair-bulk-b-bulk"]]
+    assert "pair-bulk" in svc.open_positions
+
+
+def test_bulk_leg_failure_retries_then_flattens_other_leg():
+    client = BulkClient()
+    client.fail_on["bybit:FOLKS/USDT:USDT:sell:N"] = 5
+    svc = ExecutionService(client, max_retries=1)
+
+    result = svc.execute_pair(_intent("pair-bulk-fail"))
+
+    assert not result.success
+    assert result.error == "LEG_B_FAILED"
+    assert result.recovery_action == "LEG_A_FLATTENED"
+    assert svc.open_positions == {}
+
+
+class BulkRaisesAfterFillClient(BulkClient):
+    def place_orders_bulk(self, legs, client_order_ids):
+        super().place_orders_bulk(legs, client_order_ids)
+        raise TimeoutError("response lost after submit")
+
+
+def test_bulk_failure_after_submit_is_not_resent():
+    client = BulkRaisesAfterFillClient()
+    svc = ExecutionService(client)
+
+    result = svc.execute_pair(_intent("pair-bulk-timeout"))
+
+    assert not result.success
+    assert len(client.calls) == 2  # 一括発注分のみ。個別の再発注は無い
+    assert all(r.error.startswith("BULK_UNCONFIRMED") for r in result.leg_results)
+    assert svc.open_positions == {}
+
+
+def test_unconfirmed_bulk_legs_are_flattened_by_emergency_flatten():
+    client = BulkRaisesAfterFillClient()
+    svc = ExecutionService(client)
+
+    result = svc.execute_pair(_intent("pair-bulk-lost"))
+
+    assert result.recovery_action == "UNCONFIRMED_LEGS_RECORDED"
+    assert [leg.exchange for leg in svc.unconfirmed_legs["pair-bulk-lost"]] == ["binance", "bybit"]
+
+    flat = svc.emergency_flatten()
+
+    assert flat.success
+    assert flat.closed_pairs == ["pair-bulk-lost"]
+    assert ("binance", "INIT/USDT:USDT", "sell", 1.0, True, "pair-bulk-lost-emergency-u0-0") in client.calls
+    assert ("bybit", "FOLKS/USDT:USDT", "buy", 1.0, True, "pair-bulk-lost-emergency-u1-0") in client.calls
+    assert svc.unconfirmed_legs == {}
+
+
+class BulkRaisesWithFillQueryClient(BulkRaisesAfterFillClient):
+    def fetch_order_fill(self, exchange, symbol, client_order_id):
+        # leg_a だけ約定していた
+        if client_order_id.endswith("-a-bulk"):
+            return {"id": client_order_id, "average": 100.0}
+        return None
+
+
+def test_filled_but_unconfirmed_bulk_leg_is_flattened():
+    client = BulkRaisesWithFillQueryClient()
+    svc = ExecutionService(client)
+
+    result = svc.execute_pair(_intent("pair-bulk-query"))
+
+    assert result.error == "LEG_B_FAILED"
+    assert result.recovery_action == "LEG_A_FLATTENED"
+    assert ("binance", "INIT/USDT:USDT", "sell", 1.0, True, "pair-bulk-query-flatten-a-0") in client.calls
+    assert svc.open_positions == {}
+    assert svc.unconfirmed_legs == {}
+
+
+class BulkNotSubmittedClient(BulkClient):
+    def place_orders_bulk(self, legs, client_order_ids):
+        self.bulk_calls.append(list(client_order_ids))
+        raise OrderNotSubmittedError("price unavailable")
+
+
+def test_bulk_not_submitted_falls_back_to_single_orders():
+    client = BulkNotSubmittedClient()
+    svc = ExecutionService(client)
+
+    result = svc.execute_pair(_intent("pair-bulk-pre"))
+
+    assert result.success
+    assert {c[5] for c in client.calls} == {"pair-bulk-pre-a-retry-0", "pair-bulk-pre-b-retry-0"}
+
+
+class BulkUnknownLegClient(BulkClient):
+    def place_orders_bulk(self, legs, client_order_ids):
+        results = super().place_orders_bulk(legs, client_order_ids)
+        return [results[0], OrderStatusUnknownError("no status")]
+
+
+def test_bulk_unknown_leg_is_not_resent_and_filled_leg_flattened():
+    client = BulkUnknownLegClient()
+    svc = ExecutionService(client)
+
+    result = svc.execute_pair(_intent("pair-bulk-unknown"))
+
+    assert result.error == "LEG_B_FAILED"
+    assert result.recovery_action == "LEG_A_FLATTENED"
+    assert not any(c[5].startswith("pair-bulk-unknown-b-retry") for c in client.calls)
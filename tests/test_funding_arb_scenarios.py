@@ -1,6 +1,8 @@
+import json
 from datetime import datetime
 from typing import Dict, Iterable, List, Tuple
 
+from funding_arb.backtest import BacktestCycleInput, FundingBacktester
 from funding_arb.config import ExchangeConfig, FundingArbConfig
 from funding_arb.execution import ExecutionService, ExchangeExecutionClient
 from funding_arb.market_data import MarketDataService
@@ -130,3 +132,19 @@ def test_scenario_delta_drift_triggers_rebalance():
     p = PortfolioState(equity=10000, peak_equity=10000, gross_notional_usd=1000, net_delta_usd=1500)
     orch.run_cycle(p, _features())
     assert exe.rebalance_calls == 1
+
+
+def test_backtest_streams_records_to_file(tmp_path):
+    cfg = _default_cfg()
+    snapshots = [_snap("binance", "INIT/USDT:USDT", -0.01, 5_000_000), _snap("bybit", "FOLKS/USDT:USDT", 0.01, 5_000_000)]
+    orch, _ = _orchestrator(snapshots, cfg)
+    p = PortfolioState(equity=10000, peak_equity=10000, gross_notional_usd=0, net_delta_usd=0)
+    path = tmp_path / "records.jsonl"
+
+    summary = FundingBacktester(orch, records_path=str(path)).run([BacktestCycleInput(p, _features())] * 3)
+
+    assert summary.cycles == 3
+    assert summary.records == []
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 3
+    assert sum(r["intents"] for r in lines) == summary.total_intents
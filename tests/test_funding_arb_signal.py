@@ -48,6 +48,34 @@ def test_build_candidates_requires_opposite_sign_and_persistence():
     assert c2[0].persistence == 2
 
 
+def test_build_candidates_pairs_only_opposite_signs_in_input_order():
+    cfg = FundingArbConfig(
+        min_open_interest_usd=1_000,
+        min_liquidity_score=0.2,
+        min_persistence_windows=1,
+        fr_diff_min=0.0,
+        min_pair_score=0.0,
+        expected_edge_min_bps=-999,
+    )
+    svc = SignalService(cfg)
+
+    snaps = [
+        _snapshot("binance", "A/USDT:USDT", 0.004, oi=2_000_000),
+        _snapshot("binance", "B/USDT:USDT", -0.002, oi=2_000_000),
+        _snapshot("binance", "C/USDT:USDT", 0.0, oi=2_000_000),
+        _snapshot("binance", "D/USDT:USDT", 0.003, oi=2_000_000),
+        _snapshot("binance", "E/USDT:USDT", -0.001, oi=2_000_000),
+    ]
+
+    candidates = svc.build_pair_candidates(snaps, {})
+    assert [(c.symbol_a[0], c.symbol_b[0]) for c in candidates] == [
+        ("A", "B"),
+        ("A", "E"),
+        ("B", "D"),
+        ("D", "E"),
+    ]
+
+
 def test_select_entries_halt_new_returns_empty():
     cfg = FundingArbConfig(
         min_persistence_windows=1,
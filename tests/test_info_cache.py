@@ -0,0 +1,67 @@
+import os
+import stat
+from unittest.mock import MagicMock
+
+from funding_arb._info_cache import (
+    FileCache,
+    cached_user_fills,
+    cached_user_state,
+    invalidate_user_state,
+)
+
+
+def test_file_cache_roundtrip_and_expiry(tmp_path):
+    cache = FileCache(str(tmp_path))
+    cache.set("user_state:0xabc", {"assetPositions": []})
+
+    assert cache.get("user_state:0xabc", ttl=5) == {"assetPositions": []}
+    # 別インスタンス（=別プロセス相当）でもファイルから読める
+    assert FileCache(str(tmp_path)).get("user_state:0xabc", ttl=5) == {"assetPositions": []}
+
+    assert cache.get("user_state:0xabc", ttl=0) is None
+    assert FileCache(str(tmp_path)).get("missing", ttl=5) is None
+
+
+def test_cached_user_state_hits_api_once(tmp_path):
+    cache = FileCache(str(tmp_path))
+    info = MagicMock()
+    info.user_state.return_value = {"assetPositions": [{"position": {"coin": "ETH"}}]}
+    info.user_fills.return_value = [{"coin": "ETH"}]
+
+    first = cached_user_state(info, "0xABC", ttl=5, cache=cache)
+    second = cached_user_state(info, "0xabc", ttl=5, cache=cache)
+    cached_user_fills(info, "0xabc", ttl=5, cache=cache)
+
+    assert first == second
+    assert info.user_state.call_count == 1
+    assert info.user_fills.call_count == 1
+
+
+def test_invalidate_user_state_forces_refetch(tmp_path):
+    cache = FileCache(str(tmp_path))
+    info = MagicMock()
+    info.user_state.return_value = {"assetPositions": []}
+
+    cached_user_state(info, "0xabc", cache=cache)
+    invalidate_user_state("0xabc", cache=cache)
+    cached_user_state(info, "0xabc", cache=cache)
+
+    assert info.user_state.call_count == 2
+
+
+def test_file_cache_dir_is_private(tmp_path):
+    cache_dir = tmp_path / "hl_cache"
+    cache = FileCache(str(cache_dir))
+    cache.set("user_state:0xabc", {"assetPositions": []})
+
+    assert stat.S_IMODE(os.stat(cache_dir).st_mode) == 0o700
+
+
+def test_file_cache_tightens_shared_dir(tmp_path):
+    cache_dir = tmp_path / "shared"
+    cache_dir.mkdir()
+    os.chmod(cache_dir, 0o777)
+    FileCache(str(cache_dir)).set("k", 1)
+
+    assert stat.S_IMODE(os.stat(cache_dir).st_mode) == 0o700
+    assert FileCache(str(cache_dir)).get("k", ttl=5) == 1
@@ -6,6 +6,7 @@ DynamicUniverseProvider とオーケストレータの統合を網羅的にテ
 
 from __future__ import annotations
 
+import json
 import time
 from datetime import datetime
 from typing import Dict, Iterable, List, Tuple
@@ -14,17 +15,21 @@ from unittest.mock import MagicMock, patch
 import pytest
 import requests
 
+from funding_arb.cache import DiskCache
 from funding_arb.config import ExchangeConfig, FundingArbConfig
 from funding_arb.execution import ExecutionService, ExchangeExecutionClient
+from funding_arb.http_session import _build_session
 from funding_arb.loris_client import (
     HOURLY_EXCHANGES,
     HOURLY_TO_8H_DIVISOR,
+    LORIS_FUNDING_URL,
     RATE_DIVISOR,
     LorisAPIClient,
     LorisAPIError,
     LorisExchange,
     LorisFundingRate,
     LorisResponse,
+    LorisRateMapCache,
     LorisSymbol,
 )
 from funding_arb.market_data import (
@@ -69,7 +74,9 @@ def _mock_session(json_data: dict, status_code: int = 200) -> MagicMock:
     resp = MagicMock()
     resp.status_code = status_code
     resp.json.return_value = json_data
+    resp.content = json.dumps(json_data).encode()
     resp.raise_for_status.return_value = None
+    resp.headers = {}
     session.get.return_value = resp
     return session
 
@@ -242,6 +249,9 @@ class TestLorisAPIClientFundingRateNormalization:
         rate = resp.funding_rates[0]
         assert rate.exchange == "binance"
         assert abs(rate.rate - 100 / RATE_DIVISOR) < 1e-9
+        assert resp.rate_index[("binance", "BTC")] is rate
+        assert client.get_rate("binance", "BTC") == rate
+        assert client.get_rate("binance", "ETH") is None
 
     def test_hourly_exchange_rate_normalized_to_8h(self):
         """1時間周期取引所のレートは さらに8で割られる。"""
@@ -320,6 +330,23 @@ class TestLorisAPIClientCache:
 
         assert session.get.call_count == 2
 
+    def test_not_modified_reuses_parsed_response(self):
+        """ETag 付きで再取得し、304 なら前回のレスポンスを延命する。"""
+        session = _mock_session(SAMPLE_API_RESPONSE)
+        session.get.return_value.headers = {"ETag": '"v1"'}
+        client = LorisAPIClient(session=session, cache_ttl=60)
+
+        first = client.fetch()
+        fetched_at = first.fetched_at
+        session.get.return_value.status_code = 304
+        second = client.fetch(force=True)
+
+        assert second is not first
+        assert second.funding_rates is first.funding_rates
+        assert first.fetched_at == fetched_at
+        assert second.fetched_at >= fetched_at
+        assert session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
     def test_force_fetch_ignores_cache(self):
         """force=True でキャッシュを無視する。"""
         session = _mock_session(SAMPLE_API_RESPONSE)
@@ -342,6 +369,94 @@ class TestLorisAPIClientCache:
         assert session.get.call_count == 2
 
 
+class TestLorisAPIClientDiskCache:
+    """ディスクキャッシュのテスト。"""
+
+    def test_disk_cache_shared_across_clients(self, tmp_path):
+        """別インスタンスでもTTL内ならディスクキャッシュを使う。"""
+        session = _mock_session(SAMPLE_API_RESPONSE)
+        disk_cache = DiskCache(str(tmp_path))
+
+        first = LorisAPIClient(session=session, cache_ttl=60, disk_cache=disk_cache)
+        second = LorisAPIClient(session=session, cache_ttl=60, disk_cache=disk_cache)
+        resp1 = first.fetch()
+        resp2 = second.fetch()
+
+        assert session.get.call_count == 1
+        assert resp2.funding_rates == resp1.funding_rates
+
+    def test_stale_disk_cache_used_when_api_fails(self, tmp_path):
+        """API失敗時は期限切れのディスクキャッシュを返す。"""
+        disk_cache = DiskCache(str(tmp_path))
+        LorisAPIClient(
+            session=_mock_session(SAMPLE_API_RESPONSE), disk_cache=disk_cache
+        ).fetch()
+
+        client = LorisAPIClient(
+            session=_failing_session(),
+            max_retries=1,
+            retry_delay=0.01,
+            cache_ttl=0,
+            disk_cache=disk_cache,
+        )
+        resp = client.fetch()
+
+        assert len(resp.funding_rates) == 8
+
+    def test_disk_cache_stores_plain_json(self, tmp_path):
+        """ディスクキャッシュは pickle ではなく JSON で保存する。"""
+        LorisAPIClient(
+            session=_mock_session(SAMPLE_API_RESPONSE),
+            disk_cache=DiskCache(str(tmp_path)),
+        ).fetch()
+
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1 and files[0].suffix == ".json"
+        payload = json.loads(files[0].read_text(encoding="utf-8"))
+        assert payload["value"]["raw"] == SAMPLE_API_RESPONSE
+
+    def test_corrupt_disk_cache_is_discarded(self, tmp_path):
+        """パースできないキャッシュはミス扱いにして削除し、API から取り直す。"""
+        disk_cache = DiskCache(str(tmp_path))
+        key = f"fetch:v4:{LORIS_FUNDING_URL}"
+        disk_cache.set(key, {"fetched_at": time.time(), "raw": {"funding_rates": []}})
+        session = _mock_session(SAMPLE_API_RESPONSE)
+
+        resp = LorisAPIClient(session=session, disk_cache=disk_cache).fetch()
+
+        assert session.get.call_count == 1
+        assert len(resp.funding_rates) == 8
+        assert disk_cache.get(key, ttl=None)["raw"] == SAMPLE_API_RESPONSE
+
+    def test_corrupt_stale_disk_cache_still_raises_api_error(self, tmp_path):
+        """API障害時に破損キャッシュしか無ければ LorisAPIError を送出する。"""
+        disk_cache = DiskCache(str(tmp_path))
+        key = f"fetch:v4:{LORIS_FUNDING_URL}"
+        disk_cache.set(key, {"fetched_at": 0, "raw": {"funding_rates": []}})
+        client = LorisAPIClient(
+            session=_failing_session(),
+            max_retries=1,
+            retry_delay=0.01,
+            disk_cache=disk_cache,
+        )
+
+        with pytest.raises(LorisAPIError):
+            client.fetch()
+        assert disk_cache.get(key, ttl=None) is None
+
+    def test_api_failure_without_disk_cache_raises(self, tmp_path):
+        """ディスクキャッシュが空なら LorisAPIError を送出する。"""
+        client = LorisAPIClient(
+            session=_failing_session(),
+            max_retries=1,
+            retry_delay=0.01,
+            disk_cache=DiskCache(str(tmp_path)),
+        )
+
+        with pytest.raises(LorisAPIError):
+            client.fetch()
+
+
 class TestLorisAPIClientErrorHandling:
     """エラーハンドリングのテスト。"""
 
@@ -361,10 +476,11 @@ class TestLorisAPIClientErrorHandling:
         """2回目のリトライで成功する場合。"""
         session = MagicMock(spec=requests.Session)
         good_resp = MagicMock()
-        good_resp.json.return_value = {
+        good_resp.content = json.dumps({
             "symbols": [], "exchanges": {"exchange_names": []}, "funding_rates": {}
-        }
+        }).encode()
         good_resp.raise_for_status.return_value = None
+        good_resp.headers = {}
         session.get.side_effect = [
             requests.ConnectionError("fail 1"),
             good_resp,
@@ -378,6 +494,17 @@ class TestLorisAPIClientErrorHandling:
         assert session.get.call_count == 2
         assert len(resp.funding_rates) == 0
 
+    def test_shared_session_does_not_retry_loris_host(self):
+        """共有セッションでも Loris ホストは urllib3 で再試行しない（二重リトライ防止）"""
+        session = _build_session()
+        try:
+            loris = session.get_adapter(LORIS_FUNDING_URL)
+            other = session.get_adapter("https://api.hyperliquid.xyz/info")
+            assert loris.max_retries.total == 0
+            assert other.max_retries.total == 3
+        finally:
+            session.close()
+
     def test_get_rate_returns_none_for_missing(self):
         """存在しない取引所/シンボルの get_rate は None を返す。"""
         session = _mock_session(SAMPLE_API_RESPONSE)
@@ -408,6 +535,35 @@ class TestLorisAPIClientErrorHandling:
         assert len(rates) == 3
 
 
+class TestLorisRateMapCache:
+    """TTL付きレート辞書キャッシュのテスト。"""
+
+    def test_rate_map_reused_within_ttl(self):
+        """TTL内は再取得しない。"""
+        session = _mock_session(SAMPLE_API_RESPONSE)
+        client = LorisAPIClient(session=session, cache_ttl=0)
+        cache = LorisRateMapCache(client, ttl=3600)
+
+        first = cache.get()
+        second = cache.get()
+
+        assert session.get.call_count == 1
+        assert second is first
+        assert first[("binance", "BTC")] == pytest.approx(0.0025)
+
+    def test_rate_map_refetched_after_invalidate(self):
+        """invalidate 後は再取得する。"""
+        session = _mock_session(SAMPLE_API_RESPONSE)
+        client = LorisAPIClient(session=session, cache_ttl=0)
+        cache = LorisRateMapCache(client, ttl=3600)
+
+        cache.get()
+        cache.invalidate()
+        cache.get()
+
+        assert session.get.call_count == 2
+
+
 # =========================================================================
 # 2. シンボル/取引所マッピングのテスト
 # =========================================================================
@@ -641,6 +797,110 @@ class TestHybridMarketDataService:
         assert snap.oi == 0.0  # CCXTエラーなのでデフォルト
         assert snap.bid is None
 
+    def test_batch_fetch_methods_used_once_per_exchange(self):
+        """一括取得APIを持つアダプタは銘柄ごとではなく1回だけ呼ばれる。"""
+        rates = [
+            LorisFundingRate(exchange="binance", symbol="BTC", raw_value=25, rate=0.0025),
+            LorisFundingRate(exchange="binance", symbol="ETH", raw_value=10, rate=0.001),
+        ]
+        loris_client = self._make_loris_client(rates)
+        adapter = FakeCCXTAdapter(oi=7_000_000, mark_price=100)
+        adapter.fetch_open_interests = MagicMock(side_effect=lambda symbols: {
+            s: adapter.fetch_open_interest(s) for s in symbols
+        })
+        adapter.fetch_order_books = MagicMock(side_effect=lambda symbols, limit: {
+            s: adapter.fetch_order_book(s, limit) for s in symbols
+        })
+
+        service = HybridMarketDataService(
+            loris_client=loris_client,
+            ccxt_adapters={"binance": adapter},
+        )
+
+        snapshots = service.get_funding_snapshots(
+            exchanges=["binance"], symbols=["BTC/USDT:USDT", "ETH/USDT:USDT"]
+        )
+
+        adapter.fetch_open_interests.assert_called_once_with(["BTC/USDT:USDT", "ETH/USDT:USDT"])
+        adapter.fetch_order_books.assert_called_once()
+        assert [s.oi for s in snapshots] == [7_000_000, 7_000_000]
+        assert all(s.mark_price == 100 for s in snapshots)
+
+    def test_batch_failure_falls_back_to_per_symbol_fetch(self):
+        """一括取得APIが失敗（ccxt の NotSupported など）しても銘柄ごとの値で補完する。"""
+        rates = [
+            LorisFundingRate(exchange="binance", symbol="BTC", raw_value=25, rate=0.0025),
+            LorisFundingRate(exchange="binance", symbol="ETH", raw_value=10, rate=0.001),
+        ]
+        loris_client = self._make_loris_client(rates)
+        adapter = FakeCCXTAdapter(oi=7_000_000, mark_price=100)
+        adapter.fetch_open_interests = MagicMock(side_effect=RuntimeError("NotSupported"))
+        # 一部のシンボルしか返さない一括APIも個別取得で埋める
+        adapter.fetch_order_books = MagicMock(side_effect=lambda symbols, limit: {
+            symbols[0]: adapter.fetch_order_book(symbols[0], limit)
+        })
+
+        service = HybridMarketDataService(
+            loris_client=loris_client,
+            ccxt_adapters={"binance": adapter},
+        )
+
+        snapshots = service.get_funding_snapshots(
+            exchanges=["binance"], symbols=["BTC/USDT:USDT", "ETH/USDT:USDT"]
+        )
+
+        assert [s.oi for s in snapshots] == [7_000_000, 7_000_000]
+        assert [(s.bid, s.ask) for s in snapshots] == [(99.0, 101.0), (99.0, 101.0)]
+
+    def test_multiple_exchanges_each_get_their_own_adapter_data(self):
+        """複数取引所の補完を並行しても、結果は各取引所のアダプタのものになる。"""
+        rates = [
+            LorisFundingRate(exchange="binance", symbol="BTC", raw_value=25, rate=0.0025),
+            LorisFundingRate(exchange="bybit", symbol="BTC", raw_value=-25, rate=-0.0025),
+        ]
+        loris_client = self._make_loris_client(rates)
+
+        service = HybridMarketDataService(
+            loris_client=loris_client,
+            ccxt_adapters={
+                "binance": FakeCCXTAdapter(oi=1_000_000, mark_price=100),
+                "bybit": FakeCCXTAdapter(oi=2_000_000, mark_price=200),
+            },
+        )
+
+        snapshots = service.get_funding_snapshots(
+            exchanges=["binance", "bybit"], symbols=["BTC/USDT:USDT"]
+        )
+
+        by_exchange = {s.exchange: s for s in snapshots}
+        assert by_exchange["binance"].oi == 1_000_000
+        assert by_exchange["binance"].mark_price == 100
+        assert by_exchange["bybit"].oi == 2_000_000
+        assert by_exchange["bybit"].funding_rate == -0.0025
+
+    def test_refresh_prices_called_once_alongside_loris_fetch(self):
+        """価格一括取得を持つアダプタは1回だけ refresh_prices される。"""
+        rates = [
+            LorisFundingRate(exchange="hyperliquid", symbol="BTC", raw_value=2, rate=0.000025),
+        ]
+        loris_client = self._make_loris_client(rates)
+        adapter = FakeCCXTAdapter(mark_price=50000)
+        adapter.refresh_prices = MagicMock()
+
+        service = HybridMarketDataService(
+            loris_client=loris_client,
+            ccxt_adapters={"hyperliquid": adapter},
+        )
+
+        snapshots = service.get_funding_snapshots(
+            exchanges=["hyperliquid"], symbols=["BTC/USDT:USDT"]
+        )
+
+        adapter.refresh_prices.assert_called_once_with()
+        loris_client.fetch.assert_called_once()
+        assert len(snapshots) == 1
+        assert snapshots[0].mark_price == 50000
+
     def test_get_orderbook_tops_uses_ccxt(self):
         """get_orderbook_tops は CCXT アダプタを使用する。"""
         loris_client = self._make_loris_client([])
@@ -0,0 +1,47 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from funding_arb.monitoring import AlertEvent, WebhookNotifier
+
+
+def _event() -> AlertEvent:
+    return AlertEvent(level="WARN", title="drawdown", message="dd 12%", context={"pair": "p1"})
+
+
+def test_send_without_url_is_noop():
+    session = MagicMock()
+    assert WebhookNotifier(session=session).send(_event()) is False
+    session.post.assert_not_called()
+
+
+def test_send_reuses_session_and_raises_on_error_status():
+    session = MagicMock()
+    session.post.return_value.status_code = 204
+    notifier = WebhookNotifier("https://hooks.example/alert", session=session)
+
+    assert notifier.send(_event())
+    session.post.return_value.status_code = 500
+    session.post.return_value.raise_for_status.side_effect = requests.HTTPError("500")
+    with pytest.raises(requests.HTTPError):
+        notifier.send(_event())
+
+    assert session.post.call_count == 2
+    kwargs = session.post.call_args.kwargs
+    assert kwargs["timeout"] == 5
+    body = json.loads(kwargs["data"])
+    assert body["title"] == "drawdown"
+    assert body["context"] == {"pair": "p1"}
+
+
+def test_send_accepts_non_str_context_keys():
+    session = MagicMock()
+    session.post.return_value.status_code = 200
+    event = AlertEvent(level="INFO", title="約定", message="ok", context={1: "leg_a"})
+
+    assert WebhookNotifier("https://hooks.example/alert", session=session).send(event)
+    data = session.post.call_args.kwargs["data"]
+    assert "約定".encode("utf-8") in data
+    assert json.loads(data)["context"] == {"1": "leg_a"}